@@ -0,0 +1,264 @@
+"""
+Streaming COCO export for long inference runs.
+
+COCOWriter appends every image and its annotations to two temporary fragment
+files as inference runs, so memory stays constant no matter how many images
+are processed. When a shard is finished, the fragments are stitched into one
+valid COCO JSON file with plain file copies. Only the category table, which is
+small, is kept in memory.
+
+Supported tasks: ObjectDetection, InstanceSegmentation (masks as compressed
+RLE), KeypointDetection and RotatedObjectDetection (extra ``rbox`` field
+``[cx, cy, w, h, angle]`` plus the corner polygon as ``segmentation``).
+
+Usage: python coco_writer.py TASK MODEL_PATH IMAGE_DIR OUTPUT_JSON [--shard N] [--keypoints N]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import dwsdk.dwsdk as dwsdk
+from mask_utils import mask_to_array
+from mask_rle import encode_counts, counts_to_string
+from rotated_box_utils import rotated_boxes_to_array, box_corners
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+COCO_TASKS = ("ObjectDetection", "InstanceSegmentation", "KeypointDetection", "RotatedObjectDetection")
+
+class COCOWriter:
+    """
+    Append-only COCO writer with constant memory.
+
+    Args:
+        output_path (str): Target JSON file. With sharding, shards are written
+              as ``<name>_00000.json``, ``<name>_00001.json``, ...
+        task (str): One of COCO_TASKS.
+        categories (list, optional): Known category names in id order; labels
+              seen later are appended with the next id.
+        max_annotations_per_shard (int, optional): Start a new shard once this
+              many annotations were written (only at image boundaries).
+        num_keypoints (int, optional): Keypoints per object for KeypointDetection.
+              Every annotation has exactly this many: shorter objects are padded
+              with unlabeled (v=0) points, longer ones are truncated. Defaults to
+              the largest count among the objects of the first prediction that
+              has any.
+    """
+    def __init__(self, output_path, task, categories=None, max_annotations_per_shard=None, num_keypoints=None):
+        if task not in COCO_TASKS:
+            raise ValueError(f"Unsupported task for COCO export: {task}")
+        self.output_path = output_path
+        self.task = task
+        self.max_annotations_per_shard = max_annotations_per_shard
+        self.categories = {}
+        self.num_keypoints = num_keypoints
+        for name in categories or []:
+            self._category_id(name)
+        self.next_image_id = 1
+        self.next_annotation_id = 1
+        self.shard_paths = []
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._open_shard()
+
+    def _open_shard(self):
+        self.images_part = open(self.output_path + ".images.part", "w")
+        self.annotations_part = open(self.output_path + ".annotations.part", "w")
+        self.shard_images = 0
+        self.shard_annotations = 0
+
+    def _category_id(self, name):
+        if name not in self.categories:
+            self.categories[name] = len(self.categories) + 1
+        return self.categories[name]
+
+    @staticmethod
+    def _append(part, count, record):
+        if count:
+            part.write(",\n")
+        part.write(json.dumps(record, separators=(",", ":")))
+
+    def _annotations(self, prediction):
+        """Yield (label, confidence, fields) for every object of a prediction."""
+        labels, confidences = prediction.class_labels, prediction.confidences
+        if self.task == "RotatedObjectDetection":
+            rboxes = rotated_boxes_to_array(prediction)
+            all_corners = box_corners(rboxes)
+            for label, confidence, rbox, corners in zip(labels, confidences, rboxes.tolist(), all_corners):
+                x1, y1 = corners.min(axis=0)
+                x2, y2 = corners.max(axis=0)
+                yield label, confidence, {
+                    "bbox": [x1, y1, x2 - x1, y2 - y1],
+                    "area": rbox[2] * rbox[3],
+                    "rbox": rbox,
+                    "segmentation": [corners.ravel().tolist()],
+                }
+            return
+        boxes = [[b.x1(), b.y1(), b.x2() - b.x1(), b.y2() - b.y1()] for b in prediction.boxes]
+        if self.task == "InstanceSegmentation":
+            for label, confidence, bbox, mask in zip(labels, confidences, boxes, prediction.masks):
+                pixels = mask_to_array(mask)
+                counts = encode_counts(pixels)
+                yield label, confidence, {
+                    "bbox": bbox,
+                    "area": int(counts[1::2].sum()),
+                    "segmentation": {"size": list(pixels.shape), "counts": counts_to_string(counts)},
+                    "iscrowd": 0,
+                }
+        elif self.task == "KeypointDetection":
+            objects = [list(keypoints) for keypoints in prediction.keypoints]
+            if self.num_keypoints is None and objects:
+                # Fixed once, so every annotation and the category table agree
+                self.num_keypoints = max(len(keypoints) for keypoints in objects)
+            for label, confidence, bbox, keypoints in zip(labels, confidences, boxes, objects):
+                keypoints = keypoints[:self.num_keypoints]
+                flat = [v for kp in keypoints for v in (kp.x, kp.y, 2)]
+                flat += [0, 0, 0] * (self.num_keypoints - len(keypoints))
+                yield label, confidence, {
+                    "bbox": bbox,
+                    "area": bbox[2] * bbox[3],
+                    "keypoints": flat,
+                    "num_keypoints": len(keypoints),
+                }
+        else:
+            for label, confidence, bbox in zip(labels, confidences, boxes):
+                yield label, confidence, {"bbox": bbox, "area": bbox[2] * bbox[3], "iscrowd": 0}
+
+    def add(self, file_name, prediction, width, height):
+        """
+        Append one image and all of its predicted objects.
+
+        Args:
+            file_name (str): Image reference stored in the ``images`` table.
+            prediction: Prediction of the writer's task.
+            width, height (int): Image size.
+
+        Returns:
+            int: The COCO image id.
+        """
+        image_id = self.next_image_id
+        self.next_image_id += 1
+        self._append(self.images_part, self.shard_images,
+                     {"id": image_id, "file_name": file_name, "width": int(width), "height": int(height)})
+        self.shard_images += 1
+        for label, confidence, fields in self._annotations(prediction):
+            record = {"id": self.next_annotation_id, "image_id": image_id,
+                      "category_id": self._category_id(label), "score": float(confidence)}
+            record.update(fields)
+            self._append(self.annotations_part, self.shard_annotations, record)
+            self.next_annotation_id += 1
+            self.shard_annotations += 1
+        if self.max_annotations_per_shard and self.shard_annotations >= self.max_annotations_per_shard:
+            self._finish_shard()
+            self._open_shard()
+        return image_id
+
+    def _category_table(self):
+        table = []
+        for name, category_id in self.categories.items():
+            category = {"id": category_id, "name": name, "supercategory": ""}
+            if self.task == "KeypointDetection":
+                category["keypoints"] = [f"kp_{i + 1}" for i in range(self.num_keypoints or 0)]
+                category["skeleton"] = []
+            table.append(category)
+        return table
+
+    def _shard_path(self, index):
+        if not self.max_annotations_per_shard:
+            return self.output_path
+        root, ext = os.path.splitext(self.output_path)
+        return f"{root}_{index:05d}{ext or '.json'}"
+
+    def _finish_shard(self):
+        self.images_part.close()
+        self.annotations_part.close()
+        path = self._shard_path(len(self.shard_paths))
+        header = {"info": {"description": f"DaoAI World {self.task} predictions",
+                           "date_created": time.strftime("%Y-%m-%d %H:%M:%S")}}
+        with open(path + ".tmp", "w") as out:
+            out.write(json.dumps(header)[:-1] + ',\n"images":[\n')
+            with open(self.images_part.name) as part:
+                shutil.copyfileobj(part, out)
+            out.write('\n],\n"annotations":[\n')
+            with open(self.annotations_part.name) as part:
+                shutil.copyfileobj(part, out)
+            out.write('\n],\n"categories":' + json.dumps(self._category_table()) + "}\n")
+        os.replace(path + ".tmp", path)
+        os.remove(self.images_part.name)
+        os.remove(self.annotations_part.name)
+        self.shard_paths.append(path)
+        logger.info(f"COCO shard written: {path} ({self.shard_images} images, {self.shard_annotations} annotations)")
+
+    def close(self):
+        """
+        Finish the last shard.
+
+        Returns:
+            list: Paths of all written JSON files.
+        """
+        if self.shard_images or not self.shard_paths:
+            self._finish_shard()
+        else:
+            self.images_part.close()
+            self.annotations_part.close()
+            os.remove(self.images_part.name)
+            os.remove(self.annotations_part.name)
+        return self.shard_paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def export_folder(model, task, image_dir, output_path, max_annotations_per_shard=None, num_keypoints=None):
+    """
+    Run a model over a folder and stream its predictions into COCO JSON.
+
+    ``num_keypoints`` is passed to COCOWriter (KeypointDetection only).
+
+    Returns:
+        list: Paths of the written JSON files.
+    """
+    valid_ext = (".png", ".jpg", ".jpeg", ".bmp")
+    image_names = sorted(f for f in os.listdir(image_dir) if f.lower().endswith(valid_ext))
+    start_time = time.perf_counter()
+    with COCOWriter(output_path, task, max_annotations_per_shard=max_annotations_per_shard,
+                    num_keypoints=num_keypoints) as writer:
+        for image_name in image_names:
+            try:
+                daoai_image = dwsdk.Image(os.path.join(image_dir, image_name))
+                prediction = model.inference(daoai_image)
+                writer.add(image_name, prediction, daoai_image.width, daoai_image.height)
+            except Exception as e:
+                logger.error(f"Error during export of {image_name}: {str(e)}")
+    logger.info(f"Exported {len(image_names)} images in {time.perf_counter() - start_time:.2f} seconds")
+    return writer.shard_paths
+
+def main():
+    """Export predictions of one model over an image folder as COCO JSON."""
+    # Positional arguments are everything that is neither a flag nor a flag's value
+    args = [arg for i, arg in enumerate(sys.argv[1:], 1)
+            if not arg.startswith("--") and not sys.argv[i - 1].startswith("--")]
+    if len(args) < 4:
+        logger.error("Usage: python coco_writer.py TASK MODEL_PATH IMAGE_DIR OUTPUT_JSON [--shard N] [--keypoints N]")
+        return
+    task, model_path, image_dir, output_path = args[:4]
+    shard = int(sys.argv[sys.argv.index("--shard") + 1]) if "--shard" in sys.argv else None
+    num_keypoints = int(sys.argv[sys.argv.index("--keypoints") + 1]) if "--keypoints" in sys.argv else None
+    if task not in COCO_TASKS:
+        logger.error(f"TASK must be one of: {', '.join(COCO_TASKS)}")
+        return
+
+    dwsdk.initialize()
+    model = getattr(dwsdk, task)(model_path, device=dwsdk.DeviceType.CPU)
+    export_folder(model, task, image_dir, output_path, max_annotations_per_shard=shard, num_keypoints=num_keypoints)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Pipelined asyncio client for the inference service.
+
+One event loop keeps many requests in flight without a thread per request:
+
+* a pool of persistent HTTP/1.1 keep-alive connections, opened lazily;
+* an in-flight window that bounds how many frames are outstanding;
+* per-request deadlines with automatic retry of connection errors, timeouts
+  and 5xx responses (4xx responses are not retried);
+* ``map`` delivers results in submission order or as soon as each completes.
+
+Frames are sent as base64 PNG or as binary frame messages (raw, zlib or
+shared memory, see frame_protocol.py).
+
+Usage:
+    python inference_client.py --load [--host 127.0.0.1] [--port 8000] [--requests 500]
+                               [--window 32] [--connections 8] [--encoding raw] [--unordered]
+    python inference_client.py --load --local   (starts a stand-in server in this process)
+"""
+
+import sys
+import json
+import time
+import asyncio
+import logging
+import collections
+import numpy as np
+from frame_protocol import FRAME_CONTENT_TYPE, SharedFrame, encode_frame
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+CLIENT_ENCODINGS = ("png", "raw", "zlib", "shm")
+
+class InferenceError(Exception):
+    """A request failed; ``retryable`` tells whether another attempt may succeed."""
+    def __init__(self, message, status=None, retryable=True):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection speaking just enough of the protocol for the service."""
+    def __init__(self, reader, writer, host):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+        self.open = True
+
+    async def request(self, method, path, body=b"", content_type="application/json"):
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1")
+        self.writer.write(head)
+        self.writer.write(body)  # asyncio enables TCP_NODELAY, so the split write does not stall
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, payload
+
+    def close(self):
+        self.open = False
+        self.writer.close()
+
+class ConnectionPool:
+    """
+    Reusable connections to one server.
+
+    Args:
+        host (str), port (int): Server address.
+        size (int): Maximum number of open connections.
+    """
+    def __init__(self, host, port, size=8):
+        self.host, self.port = host, port
+        self.idle = collections.deque()
+        self.slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def _acquire(self):
+        await self.slots.acquire()
+        while self.idle:
+            conn = self.idle.pop()
+            if conn.open and not conn.reader.at_eof():
+                return conn
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except BaseException:
+            self.slots.release()
+            raise
+        self.opened += 1
+        return _Connection(reader, writer, f"{self.host}:{self.port}")
+
+    def _release(self, conn, healthy):
+        if healthy and conn.open:
+            self.idle.append(conn)
+        else:
+            conn.close()
+        self.slots.release()
+
+    async def request(self, method, path, body=b"", content_type="application/json"):
+        """Send one request; a connection interrupted mid-request is closed, never reused."""
+        conn = await self._acquire()
+        healthy = False
+        try:
+            result = await conn.request(method, path, body, content_type)
+            healthy = True
+            return result
+        finally:
+            self._release(conn, healthy)
+
+    def close(self):
+        while self.idle:
+            self.idle.pop().close()
+
+class InferenceClient:
+    """
+    Asyncio client with a bounded in-flight window, retries and deadlines.
+
+    Args:
+        host (str), port (int): Service address.
+        connections (int): Size of the keep-alive connection pool.
+        window (int): Maximum requests in flight at once.
+        encoding (str): One of CLIENT_ENCODINGS; "shm" only works on the server's host.
+        retries (int): Extra attempts after a retryable failure.
+        timeout (float): Default per-request deadline in seconds, across all attempts.
+        backoff (float): First retry delay in seconds; doubles per attempt.
+    """
+    def __init__(self, host="127.0.0.1", port=8000, connections=8, window=32, encoding="raw",
+                 retries=2, timeout=10.0, backoff=0.05):
+        if encoding not in CLIENT_ENCODINGS:
+            raise ValueError(f"encoding must be one of {CLIENT_ENCODINGS}")
+        self.pool = ConnectionPool(host, port, connections)
+        self.window = window
+        self.in_flight = asyncio.Semaphore(window)
+        self.encoding = encoding
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.shared_frames = collections.deque()
+        self.stats = {"requests": 0, "failures": 0, "retries": 0}
+
+    def _encode(self, frame, shared):
+        if self.encoding == "png":
+            from inference_service import encode_image_base64
+            body = json.dumps({"image": encode_image_base64(frame[..., ::-1] if frame.ndim == 3 else frame)})
+            return body.encode("utf-8"), "application/json"
+        if self.encoding == "shm":
+            return shared.write(frame), FRAME_CONTENT_TYPE
+        return encode_frame(frame, self.encoding), FRAME_CONTENT_TYPE
+
+    def _take_shared(self, nbytes):
+        # One shared block per in-flight request; blocks are reused and grown on demand
+        while self.shared_frames:
+            shared = self.shared_frames.pop()
+            if shared.shm.size >= nbytes:
+                return shared
+            shared.close()
+        return SharedFrame(nbytes)
+
+    async def _attempt(self, body, content_type):
+        status, payload = await self.pool.request("POST", "/inference", body, content_type)
+        if status == 200:
+            return json.loads(payload)
+        message = f"HTTP {status}: {payload[:200].decode('utf-8', 'replace')}"
+        raise InferenceError(message, status=status, retryable=status >= 500)
+
+    async def infer(self, frame, timeout=None):
+        """
+        Run inference on one RGB (or single-channel) numpy frame.
+
+        Args:
+            frame (np.ndarray): Frame to send.
+            timeout (float, optional): Deadline in seconds for all attempts; defaults to the client's.
+
+        Returns:
+            dict: The service response ({"prediction": ..., "batch_size": ..., "latency_ms": ...}).
+
+        Raises:
+            InferenceError: Non-retryable error, or retries exhausted.
+            asyncio.TimeoutError: The deadline passed.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout)
+        async with self.in_flight:
+            shared = self._take_shared(frame.nbytes) if self.encoding == "shm" else None
+            try:
+                body, content_type = self._encode(frame, shared)
+                self.stats["requests"] += 1
+                for attempt in range(self.retries + 1):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError("Inference deadline passed")
+                    try:
+                        return await asyncio.wait_for(self._attempt(body, content_type), remaining)
+                    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, InferenceError) as e:
+                        if isinstance(e, InferenceError) and not e.retryable:
+                            raise
+                        if attempt == self.retries or deadline - time.monotonic() <= 0:
+                            raise
+                        self.stats["retries"] += 1
+                        await asyncio.sleep(min(self.backoff * 2 ** attempt, max(deadline - time.monotonic(), 0)))
+            except BaseException:
+                self.stats["failures"] += 1
+                raise
+            finally:
+                if shared is not None:
+                    self.shared_frames.append(shared)
+
+    async def _indexed(self, index, frame, timeout):
+        try:
+            return index, await self.infer(frame, timeout)
+        except Exception as e:
+            return index, e
+
+    async def map(self, frames, ordered=True, timeout=None):
+        """
+        Stream frames through the service, keeping the window full.
+
+        Args:
+            frames (iterable): numpy frames, e.g. a camera generator; consumed lazily.
+            ordered (bool): Yield results in submission order; otherwise as they complete.
+            timeout (float, optional): Per-request deadline.
+
+        Yields:
+            (int, dict or Exception): Frame index and its response, or the error it failed with.
+        """
+        source = enumerate(frames)
+        pending = collections.deque() if ordered else set()
+
+        def fill():
+            while len(pending) < self.window:
+                item = next(source, None)
+                if item is None:
+                    return
+                task = asyncio.ensure_future(self._indexed(*item, timeout))
+                if ordered:
+                    pending.append(task)
+                else:
+                    pending.add(task)
+
+        fill()
+        while pending:
+            if ordered:
+                yield await pending.popleft()
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    yield task.result()
+            fill()
+
+    async def close(self):
+        self.pool.close()
+        while self.shared_frames:
+            self.shared_frames.pop().close()
+        await asyncio.sleep(0)  # Let the transports finish closing
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+async def generate_load(client, frame, total, ordered=True, timeout=None):
+    """
+    Send ``total`` copies of a frame as fast as the window allows.
+
+    Returns:
+        dict: Achieved QPS, latency percentiles in ms, failures and retries.
+    """
+    latencies = []
+    errors = collections.Counter()
+    sent_at = {}
+
+    def frames():
+        for i in range(total):
+            sent_at[i] = time.perf_counter()
+            yield frame
+
+    start_time = time.perf_counter()
+    async for index, result in client.map(frames(), ordered=ordered, timeout=timeout):
+        if isinstance(result, Exception):
+            errors[type(result).__name__] += 1
+        else:
+            latencies.append(time.perf_counter() - sent_at[index])
+    elapsed = time.perf_counter() - start_time
+    percentiles = np.percentile(latencies, [50, 90, 99]) * 1000 if latencies else [float("nan")] * 3
+    return {
+        "qps": len(latencies) / elapsed,
+        "p50_ms": percentiles[0], "p90_ms": percentiles[1], "p99_ms": percentiles[2],
+        "completed": len(latencies), "failed": sum(errors.values()), "errors": dict(errors),
+        "retries": client.stats["retries"], "connections_opened": client.pool.opened,
+    }
+
+def main():
+    """Load-generator mode: report achieved QPS and latency percentiles against a running service."""
+    if "--load" not in sys.argv[1:]:
+        logger.error("Usage: python inference_client.py --load [--local] [--host H] [--port P] [--requests N] "
+                     "[--window W] [--connections C] [--encoding png|raw|zlib|shm] [--unordered]")
+        return
+
+    def option(name, default, cast):
+        return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+    host, port = option("--host", "127.0.0.1", str), option("--port", 8000, int)
+    total, window = option("--requests", 500, int), option("--window", 32, int)
+    connections, encoding = option("--connections", 8, int), option("--encoding", "raw", str)
+    ordered = "--unordered" not in sys.argv
+
+    from inference_service import InferenceServer, StandInModel, synthetic_frame
+    server = None
+    if "--local" in sys.argv:
+        server = InferenceServer(StandInModel(), host=host, port=0)
+        server.start()
+        host, port = server.server_address
+
+    async def run():
+        async with InferenceClient(host, port, connections=connections, window=window, encoding=encoding) as client:
+            frame = synthetic_frame(640, 480)
+            await generate_load(client, frame, min(window, total), ordered)  # Warm-up
+            client.stats["retries"] = 0
+            return await generate_load(client, frame, total, ordered)
+
+    try:
+        report = asyncio.run(run())
+    except Exception as e:
+        logger.error(f"Error during load generation: {str(e)}")
+        return
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    logger.info(f"{report['completed']} requests ({encoding}, window {window}, {connections} connections, "
+                f"{'ordered' if ordered else 'unordered'}): {report['qps']:.1f} req/s, "
+                f"p50 {report['p50_ms']:.1f} ms, p90 {report['p90_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms")
+    logger.info(f"Failed {report['failed']} {report['errors'] or ''}, retries {report['retries']}, "
+                f"connections opened {report['connections_opened']}")
+
+if __name__ == "__main__":
+    main()
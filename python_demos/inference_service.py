@@ -0,0 +1,401 @@
+"""
+Local HTTP inference service with micro-batching.
+
+Python counterpart of the C++ InferenceService example: clients send a
+base64-encoded PNG and receive the prediction JSON. Every HTTP connection is
+served by its own thread, but inference is not: requests are put on a queue
+and one worker thread per model coalesces them into ``inferenceBatch`` calls.
+A batch is sent as soon as it is full or the oldest request in it has waited
+``max_latency_ms``, so a lone request is delayed by at most that deadline
+while concurrent requests share one forward pass.
+
+Endpoints:
+    POST /inference   {"image": "<base64 PNG>"} -> {"prediction": {...}, "batch_size": n, ...}
+                      or a binary frame message (Content-Type application/x-dw-frame,
+                      see frame_protocol.py) with raw, zlib or shared memory pixels.
+    GET  /health      {"status": "ok"}
+    GET  /stats       Request, batch and queue-wait counters.
+
+Usage:
+    python inference_service.py TASK MODEL_PATH [--port 8000] [--batch 8] [--latency-ms 10]
+    python inference_service.py --benchmark
+"""
+
+import sys
+import json
+import time
+import queue
+import base64
+import logging
+import threading
+import http.client
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+import dwsdk.dwsdk as dwsdk
+from frame_protocol import FRAME_CONTENT_TYPE, ENCODING_SHM, SharedMemoryReader, decode_frame, read_header
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+def encode_image_base64(image):
+    """PNG-encode a BGR numpy image and wrap it in base64 (loadImageAsBase64 in the C++ example)."""
+    ok, buffer = cv2.imencode(".png", image)
+    if not ok:
+        raise ValueError("PNG encoding failed")
+    return base64.b64encode(buffer).decode("ascii")
+
+def decode_image_base64(data):
+    """Inverse of encode_image_base64; returns a dwsdk.Image in RGB order."""
+    bgr = cv2.imdecode(np.frombuffer(base64.b64decode(data), dtype=np.uint8), cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError("Request image could not be decoded")
+    return dwsdk.Image.from_numpy(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), dwsdk.Image.Type.RGB)
+
+def frame_to_image(frame):
+    """Wrap a decoded uint8 RGB or single-channel frame as a dwsdk.Image."""
+    image_type = dwsdk.Image.Type.GRAYSCALE if frame.ndim == 2 or frame.shape[2] == 1 else dwsdk.Image.Type.RGB
+    return dwsdk.Image.from_numpy(frame, image_type)
+
+class BatchStats:
+    """Thread-safe counters of the batching worker."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.queue_wait = 0.0
+        self.inference_time = 0.0
+        self.batch_sizes = {}
+
+    def add(self, size, queue_wait, inference_time, failed=False):
+        with self.lock:
+            self.requests += size
+            self.batches += 1
+            self.errors += size if failed else 0
+            self.queue_wait += queue_wait
+            self.inference_time += inference_time
+            self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "batches": self.batches,
+                "errors": self.errors,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "mean_queue_wait_ms": self.queue_wait / self.requests * 1000 if self.requests else 0.0,
+                "mean_inference_ms": self.inference_time / self.batches * 1000 if self.batches else 0.0,
+                "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            }
+
+class MicroBatcher:
+    """
+    Coalesce concurrent inference requests into inferenceBatch calls.
+
+    The model is set to ``max_batch_size`` once; a batch that closes early on
+    the deadline is filled up with its last image and the extra predictions
+    are dropped.
+
+    Args:
+        model: Loaded dwsdk model (anything with ``setBatchSize`` and ``inferenceBatch``).
+        max_batch_size (int): Upper bound of images per call; 1 disables batching.
+        max_latency_ms (float): Longest time the first request of a batch waits
+              for more requests before the batch is sent anyway.
+    """
+    def __init__(self, model, max_batch_size=8, max_latency_ms=10.0):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.model.setBatchSize(self.max_batch_size)
+        self.max_latency = max_latency_ms / 1000.0
+        self.requests = queue.Queue()
+        self.stats = BatchStats()
+        self.worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.worker.start()
+
+    def submit(self, image):
+        """
+        Queue one image.
+
+        Returns:
+            concurrent.futures.Future: Resolves to (prediction, batch_size).
+        """
+        future = concurrent.futures.Future()
+        self.requests.put((image, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        first = self.requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.requests.put(None)  # Let the outer loop stop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            images = [image for image, _, _ in batch]
+            images += [images[-1]] * (self.max_batch_size - len(images))
+            start_time = time.perf_counter()
+            queue_wait = sum(start_time - queued_at for _, _, queued_at in batch)
+            try:
+                predictions = list(self.model.inferenceBatch(images))[:len(batch)]
+                self.stats.add(len(batch), queue_wait, time.perf_counter() - start_time)
+                for (_, future, _), prediction in zip(batch, predictions):
+                    future.set_result((prediction, len(batch)))
+            except Exception as e:
+                self.stats.add(len(batch), queue_wait, time.perf_counter() - start_time, failed=True)
+                logger.error(f"Error during batched inference of {len(batch)} images: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+    def close(self):
+        """Finish the queued requests and stop the worker."""
+        self.requests.put(None)
+        self.worker.join()
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end; decoding and JSON encoding run on the connection thread, inference on the batcher."""
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients do not reconnect per frame
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid the delayed-ACK stall
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.server.batcher.stats.as_dict())
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def _decode_request(self, body):
+        if self.headers.get("Content-Type", "").split(";")[0].strip() != FRAME_CONTENT_TYPE:
+            return decode_image_base64(json.loads(body)["image"])
+        header, _ = read_header(body)
+        channels = header["shape"][2] if len(header["shape"]) == 3 else 1
+        if header["dtype"] != np.uint8 or channels not in (1, 3):
+            raise ValueError(f"Models take uint8 frames with 1 or 3 channels, got {header['dtype']} "
+                             f"with {channels} channels")
+        if header["encoding"] == ENCODING_SHM and self.client_address[0] not in ("127.0.0.1", "::1"):
+            raise ValueError("Shared memory frames are only accepted from local clients")
+        return frame_to_image(decode_frame(body, self.server.shm_reader))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/inference":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+        start_time = time.perf_counter()
+        try:
+            image = self._decode_request(body)
+        except Exception as e:
+            self._send_json(400, {"error": f"Invalid request: {str(e)}"})
+            return
+        try:
+            prediction, batch_size = self.server.batcher.submit(image).result()
+            status, response = 200, {
+                "prediction": json.loads(prediction.toJSONString()),
+                "batch_size": batch_size,
+                "latency_ms": (time.perf_counter() - start_time) * 1000,
+            }
+        except Exception as e:
+            status, response = 500, {"error": f"Inference failed: {str(e)}"}
+        try:
+            self._send_json(status, response)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. its deadline passed) and closed the connection
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+class InferenceServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server bound to one model behind a MicroBatcher.
+
+    Args:
+        model: Loaded dwsdk model.
+        host (str), port (int): Listen address; port 0 picks a free port.
+        max_batch_size (int), max_latency_ms (float): See MicroBatcher.
+    """
+    daemon_threads = True
+
+    def __init__(self, model, host="127.0.0.1", port=8000, max_batch_size=8, max_latency_ms=10.0):
+        super().__init__((host, port), InferenceRequestHandler)
+        self.batcher = MicroBatcher(model, max_batch_size, max_latency_ms)
+        self.shm_reader = SharedMemoryReader()
+
+    def start(self):
+        """Serve on a background thread; returns the thread."""
+        thread = threading.Thread(target=self.serve_forever, name="inference-server", daemon=True)
+        thread.start()
+        return thread
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        self.shm_reader.close()
+
+class StandInPrediction:
+    """Minimal prediction returned by StandInModel."""
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+
+    def toJSONString(self):
+        return json.dumps({"class_labels": ["stand_in"], "confidences": [1.0],
+                           "boxes": [[0, 0, self.width, self.height]]})
+
+class StandInModel:
+    """
+    Model substitute for end-to-end tests of the service without model files.
+
+    Each call sleeps for a fixed overhead plus a per-image cost, which mimics
+    how a GPU forward pass amortizes its launch cost over a batch. Like a real
+    model, inferenceBatch only accepts exactly the configured batch size.
+
+    Args:
+        fixed_ms (float): Cost of every inference call.
+        per_image_ms (float): Additional cost of each image in the call.
+    """
+    def __init__(self, fixed_ms=20.0, per_image_ms=2.0):
+        self.fixed = fixed_ms / 1000.0
+        self.per_image = per_image_ms / 1000.0
+        self.batch_size = 1
+
+    def setBatchSize(self, batch_size):
+        self.batch_size = batch_size
+
+    def inference(self, image):
+        time.sleep(self.fixed + self.per_image)
+        return StandInPrediction(image.width, image.height)
+
+    def inferenceBatch(self, images):
+        if len(images) != self.batch_size:
+            raise ValueError(f"Batch of {len(images)} images, model batch size is {self.batch_size}")
+        time.sleep(self.fixed + self.per_image * len(images))
+        return [StandInPrediction(image.width, image.height) for image in images]
+
+def _client_worker(host, port, payload, count, latencies):
+    conn = http.client.HTTPConnection(host, port)
+    try:
+        for _ in range(count):
+            start_time = time.perf_counter()
+            conn.request("POST", "/inference", body=payload, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: {body[:200]!r}")
+            latencies.append(time.perf_counter() - start_time)
+    finally:
+        conn.close()
+
+def run_load(host, port, payload, clients=16, requests_per_client=20):
+    """
+    Send requests from several blocking client threads.
+
+    Returns:
+        (float, np.ndarray): Achieved requests per second and per-request latencies in seconds.
+    """
+    latencies = []
+    threads = [threading.Thread(target=_client_worker, args=(host, port, payload, requests_per_client, latencies))
+               for _ in range(clients)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+    return len(latencies) / elapsed, np.array(latencies)
+
+def synthetic_frame(width=640, height=480, noise=4.0, seed=0):
+    """Smooth gradient with sensor-like noise, so the PNG compresses like a real camera frame."""
+    rng = np.random.default_rng(seed)
+    gradient = np.add.outer(np.arange(height), np.arange(width)) % 256
+    return np.clip(gradient[..., None] + rng.normal(0, noise, size=(height, width, 3)), 0, 255).astype(np.uint8)
+
+def benchmark(clients=16, requests_per_client=20, max_batch_size=8, max_latency_ms=10.0, size=(320, 240)):
+    """
+    Compare micro-batched throughput against one request per inference, using StandInModel.
+
+    The frame is kept small so PNG decoding does not hide the batching effect
+    on machines with few cores.
+    """
+    frame = synthetic_frame(*size)
+    payload = json.dumps({"image": encode_image_base64(frame)}).encode("utf-8")
+    print(f"{clients} clients x {requests_per_client} requests, {size[0]}x{size[1]} PNG "
+          f"({len(payload) / 1024:.0f} KiB per request)")
+    for name, batch_size in (("One request per inference", 1), (f"Micro-batched (<= {max_batch_size})", max_batch_size)):
+        server = InferenceServer(StandInModel(), port=0, max_batch_size=batch_size, max_latency_ms=max_latency_ms)
+        server.start()
+        host, port = server.server_address
+        try:
+            run_load(host, port, payload, clients=2, requests_per_client=2)  # Warm-up
+            server.batcher.stats = BatchStats()
+            qps, latencies = run_load(host, port, payload, clients, requests_per_client)
+            stats = server.batcher.stats.as_dict()
+        finally:
+            server.shutdown()
+            server.server_close()
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"  {name:30s} {qps:8.1f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   "
+              f"mean batch {stats['mean_batch_size']:.2f}")
+
+def main():
+    """Serve one model over HTTP until interrupted."""
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+        return
+
+    def option(name, default, cast):
+        return cast(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+    # Positional arguments are everything that is neither a flag nor a flag's value
+    args = [arg for i, arg in enumerate(sys.argv[1:], 1)
+            if not arg.startswith("--") and not sys.argv[i - 1].startswith("--")]
+    if len(args) < 2:
+        logger.error("Usage: python inference_service.py TASK MODEL_PATH [--port 8000] [--batch 8] [--latency-ms 10]")
+        return
+    task, model_path = args[:2]
+
+    try:
+        dwsdk.initialize()
+        model = getattr(dwsdk, task)(model_path, device=dwsdk.DeviceType.GPU)
+    except Exception as e:
+        logger.error(f"Error during model loading: {str(e)}")
+        return
+
+    server = InferenceServer(model, port=option("--port", 8000, int), max_batch_size=option("--batch", 8, int),
+                             max_latency_ms=option("--latency-ms", 10.0, float))
+    logger.info(f"Serving {task} on http://{server.server_address[0]}:{server.server_address[1]} "
+                f"(batch <= {server.batcher.max_batch_size}, deadline {server.batcher.max_latency * 1000:.0f} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import os
 import re
+import sys
 import cv2
 import time
 import json
 import logging
+import numpy as np
 import dwsdk.dwsdk as dwsdk
+import mask_rle
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -148,6 +151,49 @@ def save_prediction_to_json(prediction, json_path="output.json", annotation_path
     except Exception as e:
         logger.error(f"Error during JSON saving: {str(e)}")
                
+def save_prediction_rle(prediction, json_path="output_rle.json"):
+    """
+    Save the prediction with masks as compressed COCO RLE instead of polygons.
+
+    Args:
+        prediction: The prediction results.
+        json_path (str): Path to save the compact JSON file.
+
+    Returns:
+        list: The RLE dicts of the masks, or None if an error occurs.
+    """
+    try:
+        logger.info("Saving predictions with RLE masks...")
+        rles = [mask_rle.encode(mask) for mask in prediction.masks]
+        instances = [
+            {
+                "class_id": int(class_id),
+                "label": label,
+                "confidence": float(confidence),
+                "box": [box.x1(), box.y1(), box.x2(), box.y2()],
+                "segmentation": rle,
+            }
+            for class_id, label, confidence, box, rle in zip(
+                prediction.class_ids, prediction.class_labels, prediction.confidences, prediction.boxes, rles)
+        ]
+        with open(json_path, "w") as f:
+            json.dump(instances, f, separators=(",", ":"))
+        logger.info(f"RLE JSON saved to: {json_path} ({os.path.getsize(json_path) / 1024:.1f} KiB)\n")
+        return rles
+    except Exception as e:
+        logger.error(f"Error during RLE saving: {str(e)}")
+        return None
+
+def print_mask_metrics(rles, overlap_threshold=0.5):
+    """Print mask areas and overlapping instance pairs, computed on the RLE runs."""
+    masks = mask_rle.RLEMasks(rles)
+    logger.info("Mask areas (pixels): " + ", ".join(str(area) for area in masks.areas))
+    iou = masks.iou()
+    pairs = np.argwhere(np.triu(iou, k=1) >= overlap_threshold)
+    for i, j in pairs:
+        logger.info(f"  Instances {i + 1} and {j + 1} overlap with IoU {iou[i, j]:.2f}")
+    logger.info(f"{len(pairs)} instance pairs with IoU >= {overlap_threshold}\n")
+
 def print_detection_results(prediction, max_points_to_print=3):
     """Print detailed detection results with limited polygon points for readability."""
     logger.info("Printing detection results...")
@@ -199,7 +245,12 @@ def generate_output_paths(base_dir=r"python_demos\output"):
     return image_output_path, json_output_path, annotation_output_path
 
 def main():
-    """Main function to demonstrate instance segmentation."""
+    """
+    Main function to demonstrate instance segmentation.
+
+    Usage: python instance_segmentation_demo.py [--rle]
+    With --rle, masks are saved as compact COCO RLE instead of the polygon JSON files.
+    """
     logger.info("=== Starting Instance Segmentation Demo ===\n")
 
     # Paths (update these to your environment)
@@ -233,8 +284,13 @@ def main():
     # Step 7: Visualize and save results
     visualize_and_save_result(daoai_image, prediction, output_path=image_output_path)
 
-    # Step 8: Save results to JSON
-    save_prediction_to_json(prediction, json_path=json_output_path, annotation_path=annotation_output_path)
+    # Step 8: Save results to JSON (polygons) or compact RLE JSON
+    if "--rle" in sys.argv[1:]:
+        rles = save_prediction_rle(prediction, json_path=json_output_path.replace(".json", "_rle.json"))
+        if rles:
+            print_mask_metrics(rles)
+    else:
+        save_prediction_to_json(prediction, json_path=json_output_path, annotation_path=annotation_output_path)
 
     logger.info("=== Instance Segmentation Demo Completed ===")
 
@@ -5,11 +5,18 @@ import time
 import json
 import logging
 import dwsdk.dwsdk as dwsdk
+from keypoint_geometry import pack_keypoints, evaluate_checks
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger()
 
+# Example measurement recipe (keypoint indices follow the model's keypoint order; adjust to your part)
+KEYPOINT_CHECKS = [
+    {"name": "span", "type": "distance", "keypoints": [0, 1], "min": 10.0},
+    {"name": "corner_angle", "type": "angle", "keypoints": [0, 1, 2], "min": 80.0, "max": 100.0},
+]
+
 def initialize_sdk():
     """
     Initialize the SDK.
@@ -177,6 +184,31 @@ def print_detection_results(prediction, max_points_to_print=3):
     
     logger.info("\nDetection results printed successfully.\n")
 
+def measure_keypoints(predictions, checks=KEYPOINT_CHECKS):
+    """
+    Run the geometry checks on one or more predictions and log the results.
+
+    Returns:
+        dict: The evaluate_checks result, or None if an error occurs.
+    """
+    try:
+        points, valid = pack_keypoints(predictions)
+        results = evaluate_checks(points, valid, checks)
+        logger.info("Keypoint measurements:")
+        for image_index in range(points.shape[0]):
+            for object_index in range(points.shape[1]):
+                if not valid[image_index, object_index].any():
+                    continue
+                values = ", ".join(f"{check['name']} {results[check['name']][0][image_index, object_index]:.2f}"
+                                   f"{'' if results[check['name']][1][image_index, object_index] else ' (FAIL)'}"
+                                   for check in checks)
+                logger.info(f"  Object {object_index + 1}: {values}")
+        logger.info(f"Parts passed: {int(results['part_passed'].sum())}/{len(results['part_passed'])}\n")
+        return results
+    except Exception as e:
+        logger.error(f"Error during keypoint measurement: {str(e)}")
+        return None
+
 def create_output_directories(base_dir=r"python_demos\output"):
     """Create output directories if they do not exist."""
     if not os.path.exists(base_dir):
@@ -235,6 +267,7 @@ def main():
 
     # Step 6: Print detection results
     print_detection_results(prediction)
+    measure_keypoints([prediction])
     
     # Step 7: Visualize and save results
     visualize_and_save_result(daoai_image, prediction, output_path=image_output_path)
@@ -0,0 +1,238 @@
+"""
+COCO-compatible run-length encoding for SDK masks, with metrics on the runs.
+
+A mask is stored as ``{"size": [height, width], "counts": str}``, the same
+compressed RLE that pycocotools writes, so exported files can be read by any
+COCO tool. Runs are taken in column-major order and alternate between
+background and foreground, starting with background.
+
+Area, IoU and pairwise overlap are computed on the runs themselves: each
+mask's foreground is a sorted list of ``[start, end)`` intervals, and the
+intersection of two masks is read from prefix sums with ``np.searchsorted``.
+Nothing is decoded back to pixels.
+"""
+
+import sys
+import json
+import time
+import numpy as np
+from mask_utils import mask_to_array
+
+def encode_counts(mask):
+    """
+    Run lengths of a (height, width) mask in column-major order.
+
+    Returns:
+        np.ndarray: uint32 counts; even entries are background runs (the first may be 0).
+    """
+    flat = np.asarray(mask, dtype=bool).ravel(order="F")
+    if flat.size == 0:
+        return np.zeros(0, dtype=np.uint32)
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [flat.size]))
+    counts = np.diff(bounds)
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts.astype(np.uint32)
+
+def counts_to_string(counts):
+    """Compress counts into the COCO RLE string (pycocotools' rleToString)."""
+    chars = []
+    for i, x in enumerate(counts.tolist()):
+        if i > 2:
+            x -= int(counts[i - 2])
+        more = True
+        while more:
+            c = x & 0x1f
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            if more:
+                c |= 0x20
+            chars.append(chr(c + 48))
+    return "".join(chars)
+
+def string_to_counts(s):
+    """Inverse of counts_to_string (pycocotools' rleFrString)."""
+    counts = []
+    p = 0
+    while p < len(s):
+        x = 0
+        k = 0
+        more = True
+        while more:
+            c = ord(s[p]) - 48
+            x |= (c & 0x1f) << (5 * k)
+            more = c & 0x20
+            p += 1
+            k += 1
+            if not more and c & 0x10:
+                x |= -1 << (5 * k)
+        if len(counts) > 2:
+            x += counts[-2]
+        counts.append(x)
+    return np.array(counts, dtype=np.uint32)
+
+def encode(mask):
+    """
+    Encode a mask as compressed COCO RLE.
+
+    Args:
+        mask: (height, width) numpy array (non-zero is foreground), or an SDK mask.
+
+    Returns:
+        dict: ``{"size": [height, width], "counts": str}``.
+    """
+    if not isinstance(mask, np.ndarray):
+        mask = mask_to_array(mask)
+    return {"size": [int(mask.shape[0]), int(mask.shape[1])], "counts": counts_to_string(encode_counts(mask))}
+
+def decode(rle):
+    """Decode a COCO RLE (compressed or list counts) into a (height, width) uint8 mask."""
+    height, width = rle["size"]
+    counts = rle["counts"]
+    counts = string_to_counts(counts) if isinstance(counts, str) else np.asarray(counts, dtype=np.uint32)
+    values = np.zeros(len(counts), dtype=np.uint8)
+    values[1::2] = 1
+    flat = np.repeat(values, counts)
+    return flat.reshape((width, height)).T.copy()
+
+def intervals(rle):
+    """
+    Foreground of an RLE as sorted [start, end) intervals of column-major pixel indices.
+
+    Returns:
+        (np.ndarray, np.ndarray): int64 starts and ends.
+    """
+    counts = rle["counts"]
+    counts = string_to_counts(counts) if isinstance(counts, str) else np.asarray(counts)
+    bounds = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    starts, ends = bounds[1:-1:2], bounds[2::2]
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+class RLEMasks:
+    """
+    A set of RLE masks of the same image, prepared for vectorized metrics.
+
+    Args:
+        rles (list): COCO RLE dicts of the same size.
+    """
+    def __init__(self, rles):
+        self.rles = list(rles)
+        self.size = tuple(self.rles[0]["size"]) if self.rles else (0, 0)
+        self.starts, self.ends, self.prefix = [], [], []
+        for rle in self.rles:
+            starts, ends = intervals(rle)
+            self.starts.append(starts)
+            self.ends.append(ends)
+            self.prefix.append(np.concatenate(([0], np.cumsum(ends - starts))))
+        self.areas = np.array([prefix[-1] for prefix in self.prefix], dtype=np.int64)
+        self.boxes = np.array([self._box(s, e) for s, e in zip(self.starts, self.ends)], dtype=np.int64).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.rles)
+
+    def _box(self, starts, ends):
+        # [x1, y1, x2, y2) in pixels; a run that spans several columns covers every row
+        if len(starts) == 0:
+            return (0, 0, 0, 0)
+        height = self.size[0]
+        first_col, last_col = starts // height, (ends - 1) // height
+        first_row, last_row = starts % height, (ends - 1) % height
+        spans = first_col != last_col
+        y1 = 0 if spans.any() else first_row.min()
+        y2 = height if spans.any() else last_row.max() + 1
+        return (first_col.min(), y1, last_col.max() + 1, y2)
+
+    def _covered(self, j, positions):
+        # Foreground pixels of mask j before each position
+        starts, ends, prefix = self.starts[j], self.ends[j], self.prefix[j]
+        i = np.searchsorted(starts, positions, side="right")
+        inside = np.where(i > 0, np.maximum(ends[np.maximum(i - 1, 0)] - positions, 0), 0)
+        return prefix[i] - inside
+
+    def intersection(self, i, other, j):
+        """Foreground pixels shared by mask i of this set and mask j of ``other``."""
+        if len(self.starts[i]) == 0 or len(other.starts[j]) == 0:
+            return 0
+        return int((other._covered(j, self.ends[i]) - other._covered(j, self.starts[i])).sum())
+
+    def intersections(self, other=None):
+        """
+        (N, M) matrix of pixel intersections with another set (or with itself).
+
+        Pairs whose bounding boxes do not overlap are skipped without touching the runs.
+        """
+        other = self if other is None else other
+        result = np.zeros((len(self), len(other)), dtype=np.int64)
+        if len(self) == 0 or len(other) == 0:
+            return result
+        a, b = self.boxes[:, None, :], other.boxes[None, :, :]
+        overlaps = ((np.minimum(a[..., 2], b[..., 2]) > np.maximum(a[..., 0], b[..., 0])) &
+                    (np.minimum(a[..., 3], b[..., 3]) > np.maximum(a[..., 1], b[..., 1])))
+        for i, j in zip(*np.nonzero(overlaps)):
+            result[i, j] = self.intersection(i, other, j)
+        return result
+
+    def iou(self, other=None):
+        """(N, M) IoU matrix with another set (or with itself)."""
+        other = self if other is None else other
+        inter = self.intersections(other)
+        union = self.areas[:, None] + other.areas[None, :] - inter
+        return np.divide(inter, union, out=np.zeros(inter.shape, dtype=np.float64), where=union > 0)
+
+    def overlap(self, other=None):
+        """(N, M) share of each mask of this set covered by each mask of ``other``."""
+        other = self if other is None else other
+        inter = self.intersections(other)
+        return np.divide(inter, self.areas[:, None], out=np.zeros(inter.shape, dtype=np.float64),
+                         where=self.areas[:, None] > 0)
+
+def _synthetic_masks(count, height=1080, width=1440, seed=0):
+    """Random filled ellipses, for benchmarking."""
+    import cv2
+    rng = np.random.default_rng(seed)
+    masks = []
+    for _ in range(count):
+        mask = np.zeros((height, width), dtype=np.uint8)
+        centre = (int(rng.integers(100, width - 100)), int(rng.integers(100, height - 100)))
+        axes = (int(rng.integers(20, 150)), int(rng.integers(20, 150)))
+        cv2.ellipse(mask, centre, axes, float(rng.uniform(0, 180)), 0, 360, 1, -1)
+        masks.append(mask)
+    return masks
+
+def benchmark(count=50):
+    """Compare RLE size and metric speed against polygons and dense masks."""
+    import cv2
+    masks = _synthetic_masks(count)
+
+    start = time.perf_counter()
+    rles = [encode(mask) for mask in masks]
+    encode_time = time.perf_counter() - start
+    polygons = [[c.reshape(-1).tolist() for c in cv2.findContours(m, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)[0]]
+                for m in masks]
+
+    start = time.perf_counter()
+    rle_set = RLEMasks(rles)
+    iou = rle_set.iou()
+    rle_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dense = np.stack(masks).reshape(count, -1).astype(np.float32)
+    inter = dense @ dense.T
+    areas = dense.sum(axis=1)
+    dense_iou = inter / np.maximum(areas[:, None] + areas[None, :] - inter, 1)
+    dense_time = time.perf_counter() - start
+
+    assert np.allclose(iou, dense_iou)
+    assert all(np.array_equal(decode(rle), mask) for rle, mask in zip(rles[:5], masks))
+    print(f"{count} masks of {masks[0].shape[1]}x{masks[0].shape[0]}")
+    print(f"  Polygon JSON (pretty): {len(json.dumps(polygons, indent=4)) / 1024:10.1f} KiB")
+    print(f"  RLE JSON:              {len(json.dumps(rles)) / 1024:10.1f} KiB  (encode {encode_time * 1000:.1f} ms)")
+    print(f"  Dense uint8:           {sum(m.nbytes for m in masks) / 1024:10.1f} KiB")
+    print(f"  Pairwise IoU on RLE:   {rle_time * 1000:10.2f} ms")
+    print(f"  Pairwise IoU on dense: {dense_time * 1000:10.2f} ms")
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
@@ -0,0 +1,90 @@
+"""
+Bulk conversion helpers for SDK masks.
+
+Walking ``mask.toPolygons()`` -> ``polygon.points`` -> ``point.x`` / ``point.y``
+costs one Python attribute access per coordinate. The helpers below return all
+polygons of a mask as one contiguous (N, 2) float32 array plus an offsets array
+(ragged layout): polygon ``i`` is ``points[offsets[i]:offsets[i + 1]]``.
+"""
+
+import itertools
+import cv2
+import numpy as np
+
+def mask_to_array(mask, out=None):
+    """
+    Copy an SDK mask into a (height, width) uint8 numpy array.
+
+    Args:
+        mask: SDK mask object (anything with ``toImage()``), or an already
+              converted ``dwsdk.Image``.
+        out (np.ndarray, optional): Caller-supplied uint8 buffer of the same size,
+              reused across frames to avoid a new allocation.
+
+    Returns:
+        np.ndarray: The mask pixels (``out`` if it was given).
+    """
+    image = mask.toImage() if hasattr(mask, "toImage") else mask
+    pixels = np.asarray(image, dtype=np.uint8).reshape(image.height, image.width)
+    if out is None:
+        return pixels
+    np.copyto(out, pixels)
+    return out
+
+def polygons_to_arrays(mask, source="polygons"):
+    """
+    Return all polygons of a mask as a contiguous point array plus offsets.
+
+    Args:
+        mask: SDK mask object.
+        source (str): ``"polygons"`` (default) copies the exact vertices of
+              ``mask.toPolygons()`` into one preallocated array with
+              ``np.fromiter``; this still reads ``pt.x``/``pt.y`` in Python
+              once per vertex. ``"raster"`` is the opt-in fast path: it traces
+              ``mask.toImage()`` with OpenCV instead and returns only the
+              outer contours (no holes) with every boundary pixel as a vertex,
+              so the geometry differs from ``toPolygons()``.
+
+    Returns:
+        (np.ndarray, np.ndarray): float32 (N, 2) points and int64 (P + 1,) offsets.
+    """
+    if source == "raster":
+        contours, _ = cv2.findContours(mask_to_array(mask), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+        lengths = [len(c) for c in contours]
+        points = (np.concatenate(contours).reshape(-1, 2).astype(np.float32)
+                  if contours else np.empty((0, 2), dtype=np.float32))
+    elif source == "polygons":
+        polygons = [polygon.points for polygon in mask.toPolygons()]
+        lengths = [len(pts) for pts in polygons]
+        coords = itertools.chain.from_iterable((pt.x, pt.y) for pts in polygons for pt in pts)
+        points = np.fromiter(coords, dtype=np.float32, count=2 * sum(lengths)).reshape(-1, 2)
+    else:
+        raise ValueError(f"Unknown polygon source: {source}")
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return points, offsets
+
+def split_polygons(points, offsets):
+    """Return the per-polygon views of a ragged point array (no copies)."""
+    return np.split(points, offsets[1:-1])
+
+def rasterize_polygons(points, offsets, out, value=255, offset=(0, 0)):
+    """
+    Fill ragged polygons directly into a caller-supplied buffer.
+
+    Args:
+        points (np.ndarray): (N, 2) polygon vertices.
+        offsets (np.ndarray): (P + 1,) polygon start offsets.
+        out (np.ndarray): uint8 (height, width) buffer, modified in place.
+        value (int): Fill value.
+        offset (tuple): (dx, dy) added to every vertex, e.g. ``(-x0, -y0)`` to
+              rasterize into a crop that starts at ``(x0, y0)``.
+
+    Returns:
+        np.ndarray: ``out``.
+    """
+    if len(offsets) > 1:
+        int_points = np.rint(points).astype(np.int32)
+        cv2.fillPoly(out, split_polygons(int_points, offsets), value, offset=offset)
+    return out
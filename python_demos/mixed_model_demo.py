@@ -4,6 +4,7 @@ import cv2
 import time
 import json
 import logging
+import numpy as np
 os.add_dll_directory(r"C:\Program Files\DaoAI World SDK\SDK\Windows\x64\Release\3rdparty\\")
 os.add_dll_directory(r"C:\Program Files\DaoAI World SDK\SDK\Windows\x64\Release\lib\\")
 import dwsdk.dwsdk as dwsdk
@@ -92,18 +93,121 @@ def run_inference(model, img, confidence_threshold=0.5):
         logger.error(f"Inference error: {e}")
         return None
 
-def print_detection_results(pred):
+class AttributeIndex:
+    """
+    Stable attribute-name -> column mapping for attribute matrices.
+
+    Columns are only ever appended, so a column id keeps its meaning across
+    frames and batches even when new attribute names show up later.
+    """
+    def __init__(self, names=()):
+        self.names = []
+        self.columns = {}
+        for name in names:
+            self.column(name)
+
+    def column(self, name):
+        col = self.columns.get(name)
+        if col is None:
+            col = self.columns[name] = len(self.names)
+            self.names.append(name)
+        return col
+
+    def __len__(self):
+        return len(self.names)
+
+def prediction_to_arrays(pred, index, fill_value=np.nan):
+    """
+    Convert a MultilabelDetection prediction into dense numpy arrays.
+
+    Args:
+        pred: MultilabelDetection prediction.
+        index (AttributeIndex): Column index shared by all frames; extended in place.
+        fill_value (float): Score used for attributes a detection does not report.
+              NaN by default, so unreported attributes never win top_attributes
+              and never pass a threshold in attribute_mask.
+
+    Returns:
+        dict: class_ids (N,) int32, confidences (N,) float32, boxes (N, 4) float32
+              as x1, y1, x2, y2, and attributes (N, len(index)) float32.
+    """
+    num = len(pred.class_ids)
+    arrays = {
+        "class_ids": np.asarray(pred.class_ids, dtype=np.int32).reshape(num),
+        "confidences": np.asarray(pred.confidences, dtype=np.float32).reshape(num),
+        "boxes": np.array([[b.x1(), b.y1(), b.x2(), b.y2()] for b in pred.boxes],
+                          dtype=np.float32).reshape(num, 4),
+    }
+    # Register names first so the matrix is allocated once at its final width
+    rows = []
+    for attrs in pred.attributes:
+        rows.append(([index.column(name) for name in attrs.keys()], list(attrs.values())))
+    attributes = np.full((num, len(index)), fill_value, dtype=np.float32)
+    for i, (cols, scores) in enumerate(rows):
+        attributes[i, cols] = scores
+    arrays["attributes"] = attributes
+    return arrays
+
+def batch_to_arrays(preds, index, fill_value=np.nan):
+    """
+    Stack the arrays of many predictions into one table.
+
+    Returns:
+        dict: Same keys as prediction_to_arrays, concatenated over all frames, plus
+              frame_ids (N,) int32 giving the frame of every detection. Attribute
+              matrices of earlier frames are padded to the final column count.
+    """
+    per_frame = [prediction_to_arrays(pred, index, fill_value) for pred in preds]
+    width = len(index)
+    counts = [len(arrays["class_ids"]) for arrays in per_frame]
+    empty = {"class_ids": np.empty(0, np.int32), "confidences": np.empty(0, np.float32),
+             "boxes": np.empty((0, 4), np.float32)}
+    batch = {key: np.concatenate([empty[key]] + [arrays[key] for arrays in per_frame]) for key in empty}
+    attributes = np.full((sum(counts), width), fill_value, dtype=np.float32)
+    row = 0
+    for arrays, count in zip(per_frame, counts):
+        attributes[row:row + count, :arrays["attributes"].shape[1]] = arrays["attributes"]
+        row += count
+    batch["attributes"] = attributes
+    batch["frame_ids"] = np.repeat(np.arange(len(preds), dtype=np.int32), counts)
+    return batch
+
+def top_attributes(attributes):
+    """
+    Column and score of the best reported attribute of every detection (one argmax).
+
+    Unreported (NaN) attributes are ignored; a detection without any reported
+    attribute gets column -1 and score NaN.
+    """
+    if attributes.shape[1] == 0:
+        return np.full(len(attributes), -1), np.full(len(attributes), np.nan, dtype=attributes.dtype)
+    reported = ~np.isnan(attributes).all(axis=1)
+    cols = np.full(len(attributes), -1)
+    cols[reported] = np.nanargmax(attributes[reported], axis=1)
+    scores = np.full(len(attributes), np.nan, dtype=attributes.dtype)
+    scores[reported] = np.take_along_axis(attributes[reported], cols[reported, None], axis=1)[:, 0]
+    return cols, scores
+
+def attribute_mask(attributes, index, name, threshold):
+    """Boolean mask of detections whose score for attribute `name` is >= threshold."""
+    if name not in index.columns:
+        return np.zeros(len(attributes), dtype=bool)
+    return attributes[:, index.columns[name]] >= threshold
+
+def print_detection_results(pred, index=None):
     """
     Print class IDs, labels, confidences, and top attribute for each detection.
     """
+    index = index if index is not None else AttributeIndex()
+    arrays = prediction_to_arrays(pred, index)
+    top_cols, top_scores = top_attributes(arrays["attributes"])
+    has_attrs = [bool(attrs) for attrs in pred.attributes]
+
     logger.info("=== Detection Results ===")
-    for i, (cid, lbl, conf) in enumerate(zip(pred.class_ids, pred.class_labels, pred.confidences)):
+    for i, (cid, lbl, conf) in enumerate(zip(arrays["class_ids"], pred.class_labels, arrays["confidences"])):
         logger.info(f"[#{i}] ID={cid}, Label={lbl}, Conf={conf:.3f}")
-        # attributes is a list of dicts
-        attrs = pred.attributes[i]
-        if attrs:
-            key, val = max(attrs.items(), key=lambda x: x[1])
-            logger.info(f"     → Top attribute: {key} ({val:.3f})")
+        if has_attrs[i]:
+            logger.info(f"     → Top attribute: {index.names[top_cols[i]]} ({top_scores[i]:.3f})")
     logger.info("")
 
 def visualize_and_save(img, pred, out_path):
@@ -1,15 +1,25 @@
 import os
 import re
+import sys
 import cv2
 import time
 import json
 import logging
+import numpy as np
 import dwsdk.dwsdk as dwsdk
+from ocr_result_store import OCRResultStore
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger()
 
+# Two-stage (detection -> OCR) settings
+CROP_MARGIN = 4         # Pixels added around each detected label before OCR
+CROP_MIN_CONFIDENCE = 0.5
+OCR_BATCH_SIZE = 8
+CROP_PAD_MULTIPLE = 32  # Padded crop sizes are rounded up to this, so batches keep few distinct shapes
+CROP_PAD_VALUE = 255    # Labels are usually dark text on a light background
+
 def initialize_sdk():
     """
     Initialize the SDK.
@@ -163,6 +173,189 @@ def print_detection_results(prediction, max_points_to_print=3):
     
     logger.info("\nDetection results printed successfully.\n")
 
+def detection_crops(frame, detection, margin=CROP_MARGIN, min_confidence=CROP_MIN_CONFIDENCE):
+    """
+    Cut the detected boxes out of the frame as zero-copy views.
+
+    Args:
+        frame (np.ndarray): (H, W, C) RGB frame the detector ran on.
+        detection: ObjectDetection prediction.
+        margin (int): Pixels added on each side, clipped to the frame.
+        min_confidence (float): Boxes below this confidence are ignored.
+
+    Returns:
+        list: (crop view, (x0, y0)) tuples; (x0, y0) is the crop origin in the frame.
+    """
+    height, width = frame.shape[:2]
+    crops = []
+    for box, confidence in zip(detection.boxes, detection.confidences):
+        if confidence < min_confidence:
+            continue
+        x0 = max(int(np.floor(box.x1())) - margin, 0)
+        y0 = max(int(np.floor(box.y1())) - margin, 0)
+        x1 = min(int(np.ceil(box.x2())) + margin, width)
+        y1 = min(int(np.ceil(box.y2())) + margin, height)
+        if x1 > x0 and y1 > y0:
+            crops.append((frame[y0:y1, x0:x1], (x0, y0)))
+    return crops
+
+class CropBatcher:
+    """
+    Pads crops into one contiguous (B, H, W, C) batch, reusing a single buffer.
+
+    Every crop is copied to the top-left corner of its slot, so OCR coordinates
+    inside a slot are the crop coordinates: mapping back to the frame is just
+    adding the crop origin.
+    """
+    def __init__(self, pad_multiple=CROP_PAD_MULTIPLE, pad_value=CROP_PAD_VALUE):
+        self.pad_multiple = pad_multiple
+        self.pad_value = pad_value
+        self.storage = np.empty(0, dtype=np.uint8)
+
+    def pack(self, crops):
+        m = self.pad_multiple
+        height = -(-max(c.shape[0] for c in crops) // m) * m
+        width = -(-max(c.shape[1] for c in crops) // m) * m
+        channels = crops[0].shape[2]
+        size = len(crops) * height * width * channels
+        if self.storage.size < size:
+            self.storage = np.empty(size, dtype=np.uint8)
+        batch = self.storage[:size].reshape(len(crops), height, width, channels)
+        batch.fill(self.pad_value)
+        for slot, crop in zip(batch, crops):
+            slot[:crop.shape[0], :crop.shape[1]] = crop
+        return batch
+
+def read_crops(ocr_model, crops, batcher, batch_size=OCR_BATCH_SIZE):
+    """
+    Run OCR on padded crops with inferenceBatch.
+
+    Crops are sorted by area so each batch pads to a similar size, and the
+    predictions are returned in the original crop order. The model must have
+    been set to ``setBatchSize(batch_size)``; the last batch is filled up with
+    its final crop and the extra predictions are dropped.
+    """
+    order = sorted(range(len(crops)), key=lambda i: crops[i].shape[0] * crops[i].shape[1])
+    predictions = [None] * len(crops)
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        batch = batcher.pack([crops[i] for i in indices])
+        images = [dwsdk.Image.from_numpy(slot, dwsdk.Image.Type.RGB) for slot in batch]
+        images += [images[-1]] * (batch_size - len(images))
+        for i, prediction in zip(indices, ocr_model.inferenceBatch(images)[:len(indices)]):
+            predictions[i] = prediction
+    return predictions
+
+def map_ocr_to_frame(prediction, origin, label_index):
+    """
+    Convert one crop's OCR prediction into frame-coordinate records.
+
+    Returns:
+        list: dicts with text, confidence, (4, 2) float32 points in frame
+              coordinates and the index of the detected label they came from.
+    """
+    x0, y0 = origin
+    records = []
+    for text, confidence, box in zip(prediction.texts, prediction.confidences, prediction.boxes):
+        points = np.array([(pt.x, pt.y) for pt in box.points], dtype=np.float32).reshape(-1, 2)
+        points += (x0, y0)
+        records.append({"text": text, "confidence": float(confidence), "points": points, "label": label_index})
+    return records
+
+def run_two_stage(detector, ocr_model, image_path, batcher=None, batch_size=OCR_BATCH_SIZE):
+    """
+    Locate labels with ObjectDetection, then OCR only the label regions.
+
+    Args:
+        detector: ObjectDetection model that finds the labels.
+        ocr_model: OCRModel used on the crops.
+        image_path (str): Path to the image file.
+        batcher (CropBatcher, optional): Reused across frames to keep the pad buffer.
+        batch_size (int): Crops per inferenceBatch call.
+
+    Returns:
+        (np.ndarray, list): The RGB frame and the OCR records in frame coordinates,
+                            or (None, []) if an error occurs.
+    """
+    try:
+        bgr = cv2.imread(image_path)
+        if bgr is None:
+            raise ValueError(f"Unable to load image at {image_path}")
+        frame = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        batcher = batcher or CropBatcher()
+
+        start_time = time.perf_counter()
+        detection = detector.inference(dwsdk.Image.from_numpy(frame, dwsdk.Image.Type.RGB))
+        detect_time = time.perf_counter() - start_time
+
+        crops = detection_crops(frame, detection)
+        records = []
+        if crops:
+            predictions = read_crops(ocr_model, [crop for crop, _ in crops], batcher, batch_size)
+            for label_index, ((_, origin), prediction) in enumerate(zip(crops, predictions)):
+                records.extend(map_ocr_to_frame(prediction, origin, label_index))
+        total_time = time.perf_counter() - start_time
+
+        crop_area = sum(crop.shape[0] * crop.shape[1] for crop, _ in crops)
+        logger.info(f"Detected {len(crops)} labels ({crop_area / (frame.shape[0] * frame.shape[1]):.1%} of the frame), "
+                    f"read {len(records)} texts; detection {detect_time * 1000:.1f} ms, total {total_time * 1000:.1f} ms")
+        return frame, records
+    except Exception as e:
+        logger.error(f"Error during two-stage OCR: {str(e)}")
+        return None, []
+
+def print_two_stage_results(records):
+    """Print OCR texts read from detected labels, with frame-coordinate boxes."""
+    for record in records:
+        corners = ", ".join(f"({x:.0f}, {y:.0f})" for x, y in record["points"])
+        logger.info(f"  Label {record['label'] + 1}: {record['text']} (Confidence: {record['confidence']:.2f}) at {corners}")
+
+def save_two_stage_result(frame, records, image_path, json_path):
+    """Draw the frame-coordinate text boxes and save them with a JSON summary."""
+    try:
+        canvas = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        for record in records:
+            points = np.rint(record["points"]).astype(np.int32)
+            cv2.polylines(canvas, [points], True, (0, 255, 0), 2)
+            cv2.putText(canvas, record["text"], tuple(points[0]), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+        cv2.imwrite(image_path, canvas)
+        with open(json_path, "w") as f:
+            json.dump([dict(record, points=record["points"].tolist()) for record in records], f, indent=4)
+        logger.info(f"Two-stage results saved to: {image_path}, {json_path}\n")
+    except Exception as e:
+        logger.error(f"Error during saving two-stage results: {str(e)}")
+
+def store_results(db_path, image_path, prediction=None, records=None):
+    """
+    Save OCR results into the indexed SQLite store and look the first text up again.
+
+    Args:
+        db_path (str): Path of the SQLite database.
+        image_path (str): Image reference stored with the texts.
+        prediction: OCRModel prediction (whole-image mode).
+        records (list): Frame-coordinate records (two-stage mode).
+    """
+    try:
+        with OCRResultStore(db_path) as store:
+            if prediction is not None:
+                store.add(image_path, prediction)
+                texts = list(prediction.texts)
+            else:
+                store.add_records(image_path, records)
+                texts = [record["text"] for record in records]
+            store.flush()
+            logger.info(f"Stored {len(texts)} texts in: {db_path}")
+            if texts:
+                start_time = time.perf_counter()
+                hits = store.search(texts[0])
+                search_time = time.perf_counter() - start_time
+                logger.info(f"Search for '{texts[0]}' found {len(hits)} occurrences in {search_time * 1000:.2f} ms")
+                for hit in hits[:5]:
+                    logger.info(f"  {hit['image']} at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(hit['captured_at']))}")
+        logger.info("")
+    except Exception as e:
+        logger.error(f"Error during storing results: {str(e)}")
+
 def create_output_directories(base_dir=r"python_demos\output"):
     """Create output directories if they do not exist."""
     if not os.path.exists(base_dir):
@@ -191,18 +384,46 @@ def generate_output_paths(base_dir=r"python_demos\output"):
     return image_output_path, json_output_path, annotation_output_path
 
 def main():
-    """Main function to demonstrate OCR."""
+    """
+    Main function to demonstrate OCR.
+
+    Usage: python ocr_demo.py [--two-stage] [--store]
+    With --two-stage, labels are located with an ObjectDetection model first
+    and only the label regions are read by the OCR model. With --store, results
+    go to an indexed SQLite database instead of per-image JSON files.
+    """
     logger.info("=== Starting OCR Demo ===\n")
 
     # Paths (update these to your environment)
     model_path = r"data\ocr_model.dwm"
     image_path =  r"data\ocr_img.png"
+    detector_path = r"data\object_detection_model.dwm"
+    db_path = os.path.join(r"python_demos\output", "ocr_results.db")
+    use_store = "--store" in sys.argv[1:]
 
     # Step 1: Initialize SDK
     initialize_sdk()
     
     # Step 2: Load model
     model = load_model(model_path)
+
+    if "--two-stage" in sys.argv[1:]:
+        detector = dwsdk.ObjectDetection(detector_path, device=dwsdk.DeviceType.CPU)
+        model.setBatchSize(OCR_BATCH_SIZE)
+        batcher = CropBatcher()
+        run_two_stage(detector, model, image_path, batcher)  # Warm-up, excluded from timing
+        frame, records = run_two_stage(detector, model, image_path, batcher)
+        if frame is None:
+            logger.error("Exiting program due to inference failure.")
+            return
+        image_output_path, json_output_path, _ = generate_output_paths()
+        print_two_stage_results(records)
+        if use_store:
+            store_results(db_path, image_path, records=records)
+        else:
+            save_two_stage_result(frame, records, image_output_path, json_output_path)
+        logger.info("=== OCR Demo Completed ===")
+        return
     
     # Step 3: Load image
     daoai_image = load_image(image_path)
@@ -225,8 +446,11 @@ def main():
     # Step 7: Visualize and save results
     visualize_and_save_result(daoai_image, prediction, output_path=image_output_path)
 
-    # Step 8: Save results to JSON
-    save_prediction_to_json(prediction, json_path=json_output_path, annotation_path=annotation_output_path)
+    # Step 8: Save results to the SQLite store or to JSON
+    if use_store:
+        store_results(db_path, image_path, prediction=prediction)
+    else:
+        save_prediction_to_json(prediction, json_path=json_output_path, annotation_path=annotation_output_path)
 
     logger.info("=== OCR Demo Completed ===")
 
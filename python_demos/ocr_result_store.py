@@ -0,0 +1,145 @@
+"""
+Indexed SQLite sink for OCR results.
+
+Instead of two JSON files per image, every read text becomes one row in an
+SQLite database with a full-text index, so "where did serial X appear" is a
+single indexed query. Rows are buffered and written in batches inside one
+transaction, and the database runs in WAL mode so readers (e.g. a search tool)
+never block the writer.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+
+logger = logging.getLogger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    captured_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY,
+    image_id INTEGER NOT NULL REFERENCES images(id),
+    text TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    points TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS texts_image_id ON texts(image_id);
+CREATE TRIGGER IF NOT EXISTS texts_fts_insert AFTER INSERT ON texts BEGIN
+    INSERT INTO texts_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS texts_fts_delete AFTER DELETE ON texts BEGIN
+    INSERT INTO texts_fts(texts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# The trigram tokenizer (SQLite >= 3.34) matches any substring of 3+ characters,
+# which suits serial numbers; older SQLite falls back to word tokens.
+FTS_TOKENIZERS = ("trigram", "unicode61")
+
+class OCRResultStore:
+    """
+    Batched SQLite writer with full-text search over OCR texts.
+
+    Args:
+        db_path (str): Database file; created if it does not exist.
+        batch_size (int): Number of images buffered before one transaction is written.
+    """
+    def __init__(self, db_path, batch_size=256):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; fsync only at checkpoints
+        self._create_fts()
+        self.conn.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.pending = []
+
+    def _create_fts(self):
+        for tokenizer in FTS_TOKENIZERS:
+            try:
+                self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS texts_fts USING fts5("
+                                  f"text, content='texts', content_rowid='id', tokenize='{tokenizer}')")
+                return
+            except sqlite3.OperationalError:
+                continue
+        raise RuntimeError("SQLite was built without FTS5 support")
+
+    def add(self, image_path, prediction, captured_at=None):
+        """Buffer the texts, confidences and box points of one OCRModel prediction."""
+        records = [(text, float(confidence), [(pt.x, pt.y) for pt in box.points])
+                   for text, confidence, box in zip(prediction.texts, prediction.confidences, prediction.boxes)]
+        self.add_records(image_path, records, captured_at)
+
+    def add_records(self, image_path, records, captured_at=None):
+        """
+        Buffer already extracted results of one image.
+
+        Args:
+            image_path (str): Image reference stored with the texts.
+            records (list): (text, confidence, points) tuples, or the dicts
+                  returned by the two-stage OCR mode.
+            captured_at (float, optional): Unix time; defaults to now.
+        """
+        rows = []
+        for record in records:
+            if isinstance(record, dict):
+                record = (record["text"], record["confidence"], record["points"])
+            text, confidence, points = record
+            points = points.tolist() if hasattr(points, "tolist") else points
+            rows.append((text, float(confidence), json.dumps(points)))
+        self.pending.append((image_path, captured_at or time.time(), rows))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered image in one transaction."""
+        if not self.pending:
+            return
+        with self.conn:
+            for image_path, captured_at, rows in self.pending:
+                image_id = self.conn.execute("INSERT INTO images(path, captured_at) VALUES (?, ?)",
+                                             (image_path, captured_at)).lastrowid
+                self.conn.executemany("INSERT INTO texts(image_id, text, confidence, points) VALUES (?, ?, ?, ?)",
+                                      [(image_id,) + row for row in rows])
+        self.pending.clear()
+
+    def search(self, query, limit=100):
+        """
+        Find the images where a text appeared.
+
+        Args:
+            query (str): Text to look for, matched as a phrase (a substring with
+                  the trigram tokenizer, which needs at least 3 characters).
+            limit (int): Maximum number of rows.
+
+        Returns:
+            list: dicts with text, confidence, points, image path and capture time,
+                  newest first.
+        """
+        self.flush()
+        phrase = '"' + query.replace('"', '""') + '"'
+        rows = self.conn.execute(
+            "SELECT t.text, t.confidence, t.points, i.path, i.captured_at "
+            "FROM texts_fts JOIN texts t ON t.id = texts_fts.rowid JOIN images i ON i.id = t.image_id "
+            "WHERE texts_fts MATCH ? ORDER BY i.captured_at DESC LIMIT ?", (phrase, limit)).fetchall()
+        return [{"text": text, "confidence": confidence, "points": json.loads(points),
+                 "image": path, "captured_at": captured_at}
+                for text, confidence, points, path, captured_at in rows]
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import logging
+import concurrent.futures
+import numpy as np
+import dwsdk.dwsdk as dwsdk
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+class PipelineNode:
+    """
+    One model of an inspection station.
+
+    Args:
+        name (str): Unique node name; also the key of its result.
+        model: Loaded dwsdk model (ClassificationModel, MultilabelDetection, OCRModel, ...).
+        depends_on (tuple): Names of nodes that must finish before this one starts.
+        run (callable, optional): run(model, image, upstream) -> result, where upstream
+              maps dependency names to their results. Defaults to model.inference(image).
+        when (callable, optional): when(upstream) -> bool. If it returns False the node
+              is skipped for this frame and its result is None (cascade gating).
+              Nodes that depend on a skipped node are skipped as well.
+    """
+    def __init__(self, name, model, depends_on=(), run=None, when=None):
+        self.name = name
+        self.model = model
+        self.depends_on = tuple(depends_on)
+        self.run = run or (lambda model, image, upstream: model.inference(image))
+        self.when = when
+
+class PipelineStats:
+    """Per-node and per-frame latency samples, plus skip counts of gated nodes."""
+    def __init__(self):
+        self.node_times = {}
+        self.frame_times = []
+        self.skips = {}
+
+    def add(self, node_times, frame_time, skipped=()):
+        for name, seconds in node_times.items():
+            self.node_times.setdefault(name, []).append(seconds)
+        for name in skipped:
+            self.skips[name] = self.skips.get(name, 0) + 1
+        self.frame_times.append(frame_time)
+
+    def report(self):
+        logger.info("=== Pipeline Latency (ms) ===")
+        for name, samples in self.node_times.items():
+            ms = np.asarray(samples) * 1000
+            logger.info(f"  {name:<20} mean {ms.mean():8.2f}  p50 {np.percentile(ms, 50):8.2f}  "
+                        f"p95 {np.percentile(ms, 95):8.2f}  max {ms.max():8.2f}  (n={len(ms)})")
+        if self.frame_times:
+            frame_ms = np.asarray(self.frame_times) * 1000
+            node_sum = sum(np.sum(samples) for samples in self.node_times.values()) * 1000
+            logger.info(f"  {'frame (wall)':<20} mean {frame_ms.mean():8.2f}  p50 {np.percentile(frame_ms, 50):8.2f}  "
+                        f"p95 {np.percentile(frame_ms, 95):8.2f}  max {frame_ms.max():8.2f}")
+            logger.info(f"  Sum of node time / wall time: {node_sum / frame_ms.sum():.2f}x concurrency")
+        self.report_skips()
+
+    def report_skips(self):
+        # Compute saved is estimated from the node's mean latency on the frames where it did run
+        if not self.skips:
+            return
+        frames = len(self.frame_times)
+        logger.info("=== Cascade Gating ===")
+        for name, skips in self.skips.items():
+            samples = self.node_times.get(name, [])
+            mean_ms = np.mean(samples) * 1000 if samples else float("nan")
+            saved_ms = skips * mean_ms
+            spent_ms = np.sum(samples) * 1000
+            saved_share = saved_ms / (saved_ms + spent_ms) if samples else float("nan")
+            logger.info(f"  {name:<20} skipped {skips}/{frames} frames ({skips / frames:.1%}), "
+                        f"saved ~{saved_ms:.0f} ms ({saved_share:.1%} of its compute)")
+
+class Pipeline:
+    """
+    Runs a DAG of models on a shared, once-decoded frame.
+
+    Nodes whose dependencies are satisfied are submitted to a thread pool right
+    away, so independent models run concurrently and each node starts as soon
+    as its own inputs are ready.
+    """
+    def __init__(self, nodes, max_workers=None):
+        self.nodes = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate pipeline node: {node.name}")
+            self.nodes[node.name] = node
+        for node in nodes:
+            missing = [dep for dep in node.depends_on if dep not in self.nodes]
+            if missing:
+                raise ValueError(f"Node {node.name} depends on unknown nodes: {missing}")
+        self.order = self._topological_order()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or len(self.nodes))
+        self.stats = PipelineStats()
+
+    def _topological_order(self):
+        remaining = {name: set(node.depends_on) for name, node in self.nodes.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Pipeline has a cycle between: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+                for deps in remaining.values():
+                    deps.discard(name)
+            order.extend(ready)
+        return order
+
+    def _run_node(self, node, image, results):
+        upstream = {dep: results[dep] for dep in node.depends_on}
+        start = time.perf_counter()
+        result = node.run(node.model, image, upstream)
+        return result, time.perf_counter() - start
+
+    def run(self, image):
+        """
+        Run every node on one frame.
+
+        Args:
+            image (dwsdk.Image): The decoded frame shared by all nodes.
+
+        Returns:
+            (dict, dict): Results and latencies in seconds, keyed by node name.
+        """
+        frame_start = time.perf_counter()
+        results, node_times = {}, {}
+        skipped = []
+        running = {}
+        waiting = list(self.order)
+        while waiting or running:
+            ready = [n for n in waiting if all(dep in results for dep in self.nodes[n].depends_on)]
+            for name in ready:
+                waiting.remove(name)
+                node = self.nodes[name]
+                # A skipped dependency skips its dependents too, so gating cascades down the DAG
+                if (any(dep in skipped for dep in node.depends_on) or
+                        (node.when is not None and not node.when({dep: results[dep] for dep in node.depends_on}))):
+                    results[name] = None
+                    skipped.append(name)
+                    continue
+                running[self.executor.submit(self._run_node, node, image, results)] = name
+            if not running:
+                continue  # Only skips happened; re-check what became ready
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], node_times[name] = future.result()
+        self.stats.add(node_times, time.perf_counter() - frame_start, skipped)
+        return results, node_times
+
+    def run_file(self, image_path):
+        """Decode the image once and run the pipeline on it."""
+        return self.run(dwsdk.Image(image_path))
+
+    def close(self):
+        self.executor.shutdown()
+
+def classification_gate(stage, good_label, min_confidence=0.9):
+    """
+    Run the gated node unless ClassificationModel `stage` is confidently good.
+
+    The frame is skipped only if the top flag is `good_label` with confidence
+    >= min_confidence; anything less certain goes to the expensive model.
+    """
+    def when(upstream):
+        flags = upstream[stage].flags
+        if not flags:
+            return True
+        top = max(flags, key=lambda flag: flag.confidence)
+        return not (top.label == good_label and top.confidence >= min_confidence)
+    return when
+
+def presence_gate(stage, min_confidence=0.5, labels=None):
+    """Run the gated node only if PresenceChecking `stage` found something (optionally of `labels`)."""
+    def when(upstream):
+        prediction = upstream[stage]
+        return any(conf >= min_confidence and (labels is None or label in labels)
+                   for label, conf in zip(prediction.class_labels, prediction.confidences))
+    return when
+
+def deviation_gate(stage, threshold, margin=0.0):
+    """
+    Run the gated node if the unsupervised model `stage` scores near or above its threshold.
+
+    A frame is skipped only when ai_deviation_score < threshold - margin, so
+    borderline parts still get the expensive check.
+    """
+    def when(upstream):
+        return upstream[stage].ai_deviation_score >= threshold - margin
+    return when
+
+def build_cascade(model_dir, device=dwsdk.DeviceType.CPU, good_label="good", min_confidence=0.9):
+    """
+    Example cascade: a fast classifier decides whether instance segmentation runs.
+
+    Swap the gate for presence_gate or deviation_gate to use PresenceChecking or
+    an unsupervised model as the first stage.
+    """
+    return Pipeline([
+        PipelineNode("classification", dwsdk.ClassificationModel(os.path.join(model_dir, "classification_model.dwm"), device=device)),
+        PipelineNode("instance_segmentation",
+                     dwsdk.InstanceSegmentation(os.path.join(model_dir, "instance_segmentation_model.dwm"), device=device),
+                     depends_on=["classification"],
+                     when=classification_gate("classification", good_label, min_confidence)),
+    ])
+
+def build_station(model_dir, device=dwsdk.DeviceType.CPU):
+    """
+    Example station: classification, multilabel detection and OCR on the same frame.
+
+    The three models are independent, so they run concurrently. Add depends_on
+    to a node to feed it the results of another one.
+    """
+    return Pipeline([
+        PipelineNode("classification", dwsdk.ClassificationModel(os.path.join(model_dir, "classification_model.dwm"), device=device)),
+        PipelineNode("multilabel", dwsdk.MultilabelDetection(os.path.join(model_dir, "mix_model.dwm"), device=device)),
+        PipelineNode("ocr", dwsdk.OCRModel(os.path.join(model_dir, "ocr_model.dwm"), device=device)),
+    ])
+
+def main():
+    """
+    Run the example station over a folder of images and report per-node latency.
+
+    Usage: python pipeline_demo.py [image_dir] [--cascade]
+    """
+    logger.info("=== Starting Pipeline Demo ===\n")
+
+    # Paths (update these to your environment)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    model_dir = "data"
+    image_dir = args[0] if args else "data"
+    valid_ext = (".png", ".jpg", ".jpeg", ".bmp")
+
+    dwsdk.initialize()
+    pipeline = build_cascade(model_dir) if "--cascade" in sys.argv[1:] else build_station(model_dir)
+    image_paths = sorted(os.path.join(image_dir, f) for f in os.listdir(image_dir) if f.lower().endswith(valid_ext))
+    if not image_paths:
+        logger.error(f"No images found in: {image_dir}")
+        return
+
+    # Warm up every model once so the first-inference cost is not measured
+    pipeline.run_file(image_paths[0])
+    pipeline.stats = PipelineStats()
+
+    for image_path in image_paths:
+        results, node_times = pipeline.run_file(image_path)
+        timing = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in node_times.items())
+        logger.info(f"{os.path.basename(image_path)}: {timing}")
+
+    pipeline.stats.report()
+    pipeline.close()
+    logger.info("=== Pipeline Demo Completed ===")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import os
 import re
+import sys
 import cv2
 import time
 import json
 import logging
+import numpy as np
 import dwsdk.dwsdk as dwsdk
+from mask_utils import polygons_to_arrays, split_polygons
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -163,13 +166,13 @@ def print_detection_results(prediction, max_points_to_print=3):
     
     logger.info("\nMasks to Polygons:")
     for mask in prediction.masks:
-        polygons = mask.toPolygons()
-        for i, polygon in enumerate(polygons):
+        points, offsets = polygons_to_arrays(mask)
+        for i, polygon in enumerate(split_polygons(points, offsets)):
             logger.info(f"  Polygon {i + 1}:")
-            for j, point in enumerate(polygon.points[:max_points_to_print]):
-                logger.info(f"    Point {j + 1}: ({point.x}, {point.y})")
-            if len(polygon.points) > max_points_to_print:
-                logger.info(f"    ... and {len(polygon.points) - max_points_to_print} more points omitted.")
+            for j, (x, y) in enumerate(polygon[:max_points_to_print]):
+                logger.info(f"    Point {j + 1}: ({x}, {y})")
+            if len(polygon) > max_points_to_print:
+                logger.info(f"    ... and {len(polygon) - max_points_to_print} more points omitted.")
     
     logger.info("\nKeypoints:")
     for obj_index, keypoints in enumerate(prediction.keypoints):
@@ -179,6 +182,206 @@ def print_detection_results(prediction, max_points_to_print=3):
     
     logger.info("\nDetection results printed successfully.\n")
 
+def prediction_to_arrays(prediction, origin=(0, 0)):
+    """
+    Extract boxes, keypoints and confidences of a positioning prediction as arrays.
+
+    Args:
+        prediction: PositioningModel prediction.
+        origin (tuple): (x0, y0) of the crop the model ran on; added to every
+              coordinate so the result is in frame coordinates.
+
+    Returns:
+        dict: boxes (N, 4) float32 [x1, y1, x2, y2], keypoints list of (K, 2)
+              float32 arrays, confidences (N,) float32 and class_labels.
+    """
+    x0, y0 = origin
+    boxes = np.array([[b.x1(), b.y1(), b.x2(), b.y2()] for b in prediction.boxes], dtype=np.float32).reshape(-1, 4)
+    boxes += (x0, y0, x0, y0)
+    keypoints = [np.array([(kp.x, kp.y) for kp in kps], dtype=np.float32).reshape(-1, 2) + (x0, y0)
+                 for kps in prediction.keypoints]
+    return {
+        "boxes": boxes,
+        "keypoints": keypoints,
+        "confidences": np.asarray(prediction.confidences, dtype=np.float32).reshape(-1),
+        "class_labels": list(prediction.class_labels),
+    }
+
+def position_drift(reference, tracked):
+    """
+    Largest coordinate error (pixels) of a tracked result against a full-frame one.
+
+    Every reference box is matched to the tracked box with the nearest centre.
+    A different object count counts as infinite drift.
+    """
+    ref_boxes, trk_boxes = reference["boxes"], tracked["boxes"]
+    if len(ref_boxes) != len(trk_boxes):
+        return float("inf")
+    if len(ref_boxes) == 0:
+        return 0.0
+    ref_centres = (ref_boxes[:, :2] + ref_boxes[:, 2:]) / 2
+    trk_centres = (trk_boxes[:, :2] + trk_boxes[:, 2:]) / 2
+    match = np.linalg.norm(ref_centres[:, None] - trk_centres[None], axis=2).argmin(axis=1)
+    drift = float(np.abs(ref_boxes - trk_boxes[match]).max())
+    for i, j in enumerate(match):
+        if i < len(reference["keypoints"]) and j < len(tracked["keypoints"]):
+            ref_kps, trk_kps = reference["keypoints"][i], tracked["keypoints"][j]
+            if len(ref_kps) != len(trk_kps):
+                return float("inf")
+            if len(ref_kps):
+                drift = max(drift, float(np.linalg.norm(ref_kps - trk_kps, axis=1).max()))
+    return drift
+
+class PositioningTracker:
+    """
+    Runs PositioningModel on a search window predicted from the previous frame.
+
+    The window is the bounding rectangle of the last boxes and keypoints,
+    shifted by the last frame-to-frame motion and grown by ``margin`` of its
+    size on every side. When nothing is found in the window, or the best
+    confidence drops below ``min_confidence``, the same frame is searched
+    again on the full image. Every ``audit_interval`` tracked frames the full
+    frame is also run and the position drift between both results is recorded;
+    a drift above ``drift_budget`` pixels resets the window.
+
+    Args:
+        model: Loaded PositioningModel.
+        margin (float): Window growth, as a fraction of the window size per side.
+        min_pad (int): Minimum growth in pixels per side.
+        min_confidence (float): Below this, the frame falls back to a full-frame search.
+        audit_interval (int): Tracked frames between drift audits (0 disables audits).
+        drift_budget (float): Allowed drift in pixels before the window is reset.
+    """
+    def __init__(self, model, margin=0.5, min_pad=32, min_confidence=0.8, audit_interval=30, drift_budget=3.0):
+        self.model = model
+        self.margin = margin
+        self.min_pad = min_pad
+        self.min_confidence = min_confidence
+        self.audit_interval = audit_interval
+        self.drift_budget = drift_budget
+        self.window = None
+        self.last_centre = None
+        self.velocity = np.zeros(2, dtype=np.float32)
+        self.since_audit = 0
+        self.stats = {"roi": [], "full": [], "fallbacks": 0, "resets": 0, "drift": []}
+
+    def reset(self):
+        self.window = None
+        self.last_centre = None
+        self.velocity[:] = 0
+
+    def _infer(self, frame, window=None):
+        if window is None:
+            crop, origin = frame, (0, 0)
+        else:
+            x0, y0, x1, y1 = window
+            crop, origin = np.ascontiguousarray(frame[y0:y1, x0:x1]), (x0, y0)
+        start = time.perf_counter()
+        prediction = self.model.inference(dwsdk.Image.from_numpy(crop, dwsdk.Image.Type.RGB))
+        self.stats["full" if window is None else "roi"].append(time.perf_counter() - start)
+        return prediction_to_arrays(prediction, origin)
+
+    def _confident(self, result):
+        return len(result["confidences"]) > 0 and result["confidences"].max() >= self.min_confidence
+
+    def _update_window(self, result, frame_shape):
+        points = np.concatenate([result["boxes"].reshape(-1, 2)] + result["keypoints"])
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        centre = (lo + hi) / 2
+        if self.last_centre is not None:
+            self.velocity = centre - self.last_centre
+        self.last_centre = centre
+        pad = np.maximum((hi - lo) * self.margin, self.min_pad)
+        lo, hi = lo + self.velocity - pad, hi + self.velocity + pad
+        height, width = frame_shape[:2]
+        x0, y0 = np.clip(np.floor(lo), 0, (width, height)).astype(int)
+        x1, y1 = np.clip(np.ceil(hi), 0, (width, height)).astype(int)
+        self.window = (x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None
+
+    def track(self, frame):
+        """
+        Locate the part in one RGB frame.
+
+        Returns:
+            (dict, str): The result in frame coordinates (see prediction_to_arrays)
+                         and the mode used: "roi", "fallback" or "full".
+        """
+        mode = "full"
+        result = None
+        if self.window is not None:
+            result = self._infer(frame, self.window)
+            mode = "roi"
+            if not self._confident(result):
+                self.stats["fallbacks"] += 1
+                self.reset()  # The part jumped or vanished; the old motion estimate is meaningless
+                result, mode = None, "fallback"
+            elif self.audit_interval:
+                self.since_audit += 1
+                if self.since_audit >= self.audit_interval:
+                    self.since_audit = 0
+                    reference = self._infer(frame)
+                    drift = position_drift(reference, result)
+                    self.stats["drift"].append(drift)
+                    if drift > self.drift_budget:
+                        logger.warning(f"Tracking drift {drift:.2f} px exceeds budget {self.drift_budget} px; resetting window")
+                        self.stats["resets"] += 1
+                        self.reset()
+                        result = reference
+        if result is None:
+            result = self._infer(frame)
+        if self._confident(result):
+            self._update_window(result, frame.shape)
+        else:
+            self.reset()
+        return result, mode
+
+    def report(self):
+        """Log the latency of window vs full-frame runs, fallbacks and the measured drift."""
+        logger.info("=== Tracking Statistics ===")
+        for name in ("roi", "full"):
+            samples = np.asarray(self.stats[name]) * 1000
+            if len(samples):
+                logger.info(f"  {name:<5} runs {len(samples):5d}  mean {samples.mean():8.2f} ms  p95 {np.percentile(samples, 95):8.2f} ms")
+        logger.info(f"  Fallbacks to full frame: {self.stats['fallbacks']}, window resets: {self.stats['resets']}")
+        drift = np.asarray(self.stats["drift"])
+        if len(drift):
+            within = np.mean(drift <= self.drift_budget)
+            logger.info(f"  Drift audits {len(drift)}: median {np.median(drift):.2f} px, max {drift.max():.2f} px, "
+                        f"{within:.0%} within the {self.drift_budget} px budget")
+
+def track_video(model, video_path, max_frames=None, **tracker_options):
+    """
+    Run the tracking mode over a video file or camera index.
+
+    Args:
+        model: Loaded PositioningModel.
+        video_path (str or int): Video file path or camera index.
+        max_frames (int, optional): Stop after this many frames.
+        **tracker_options: Passed to PositioningTracker.
+
+    Returns:
+        PositioningTracker: The tracker, holding the statistics.
+    """
+    tracker = PositioningTracker(model, **tracker_options)
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        logger.error(f"Unable to open video: {video_path}")
+        return tracker
+    try:
+        frame_index = 0
+        while max_frames is None or frame_index < max_frames:
+            ok, bgr = capture.read()
+            if not ok:
+                break
+            result, mode = tracker.track(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+            if mode != "roi":
+                logger.info(f"Frame {frame_index}: {mode} search, {len(result['boxes'])} objects")
+            frame_index += 1
+    finally:
+        capture.release()
+    tracker.report()
+    return tracker
+
 def create_output_directories(base_dir=r"python_demos\output"):
     """Create output directories if they do not exist."""
     if not os.path.exists(base_dir):
@@ -207,7 +410,13 @@ def generate_output_paths(base_dir=r"python_demos\output"):
     return image_output_path, json_output_path, annotation_output_path
 
 def main():
-    """Main function to demonstrate Positioning."""
+    """
+    Main function to demonstrate Positioning.
+
+    Usage: python positioning_demo.py [--track VIDEO]
+    With --track, frames of VIDEO (a file or camera index) are positioned with
+    the temporal search-window tracker instead of a single full image.
+    """
     logger.info("=== Starting Positioning Demo ===\n")
 
     # Paths (update these to your environment)
@@ -219,6 +428,13 @@ def main():
     
     # Step 2: Load model
     model = load_model(model_path)
+
+    if "--track" in sys.argv[1:]:
+        args = sys.argv[sys.argv.index("--track") + 1:]
+        video = args[0] if args else 0
+        track_video(model, int(video) if str(video).isdigit() else video)
+        logger.info("=== Positioning Demo Completed ===")
+        return
     
     # Step 3: Load image
     daoai_image = load_image(image_path)
@@ -1,9 +1,11 @@
 import os
 import re
+import sys
 import cv2
 import time
 import json
 import logging
+import numpy as np
 import dwsdk.dwsdk as dwsdk
 
 # Set up logging
@@ -161,6 +163,158 @@ def print_detection_results(prediction, max_points_to_print=3):
     
     logger.info("\nDetection results printed successfully.\n")
 
+class ChangeFilter:
+    """
+    Decides whether a frame differs enough from the last inferred frame to re-run the model.
+
+    Frames are reduced to a small grayscale thumbnail and compared against the
+    thumbnail of the last frame the model actually saw (not the previous
+    frame, so slow drift still accumulates into a change). A frame counts as
+    changed if any of these holds:
+
+    - mean absolute difference over the thumbnail > ``mean_threshold``;
+    - share of thumbnail pixels differing by more than ``pixel_threshold`` > ``changed_fraction``;
+    - mean absolute difference inside any ROI > ``roi_threshold``;
+    - ``max_skips`` frames in a row were already reused.
+
+    Args:
+        size (tuple): Thumbnail (width, height).
+        mean_threshold (float): Gray levels.
+        pixel_threshold (int): Gray levels for a pixel to count as changed.
+        changed_fraction (float): Share of changed pixels that triggers inference.
+        rois (list, optional): (x, y, w, h) regions in full-frame pixels, e.g. the
+              part slots; ROI means are computed for all regions at once from an
+              integral image of the difference.
+        roi_threshold (float): Gray levels, per ROI.
+        max_skips (int): Upper bound on consecutive reused predictions (0 = unbounded).
+        stride (int): Only every stride-th row and column is read before the
+              thumbnail is area-averaged; keeps the filter near 1 ms on large frames.
+    """
+    def __init__(self, size=(96, 72), mean_threshold=2.0, pixel_threshold=25, changed_fraction=0.002,
+                 rois=None, roi_threshold=4.0, max_skips=300, stride=4):
+        self.size = size
+        self.stride = stride
+        self.mean_threshold = mean_threshold
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.rois = np.asarray(rois if rois else [], dtype=np.float64).reshape(-1, 4)
+        self.roi_threshold = roi_threshold
+        self.max_skips = max_skips
+        self.reference = None
+        self.roi_cells = None
+        self.consecutive_skips = 0
+        self.metrics = {"frames": 0, "inferences": 0, "skips": 0, "forced": 0,
+                        "mean_diff": 0.0, "changed_fraction": 0.0, "roi_diff": 0.0}
+
+    def _thumbnail(self, frame):
+        sampled = frame[::self.stride, ::self.stride]
+        gray = cv2.cvtColor(sampled, cv2.COLOR_RGB2GRAY) if sampled.ndim == 3 else sampled
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _roi_cells(self, frame_shape):
+        # ROIs in thumbnail cells, at least one cell each
+        scale = np.array([self.size[0] / frame_shape[1], self.size[1] / frame_shape[0]] * 2)
+        x, y, w, h = (self.rois * scale).T
+        x0 = np.clip(np.floor(x), 0, self.size[0] - 1).astype(int)
+        y0 = np.clip(np.floor(y), 0, self.size[1] - 1).astype(int)
+        x1 = np.clip(np.ceil(x + w), x0 + 1, self.size[0]).astype(int)
+        y1 = np.clip(np.ceil(y + h), y0 + 1, self.size[1]).astype(int)
+        return x0, y0, x1, y1
+
+    def changed(self, frame):
+        """
+        Compare a frame against the last inferred one and update the metrics.
+
+        Returns:
+            (bool, np.ndarray): Whether to run inference, and the frame's thumbnail
+                                (pass it to accept() once the model has run).
+        """
+        self.metrics["frames"] += 1
+        thumbnail = self._thumbnail(frame)
+        if self.reference is None or self.reference.shape != thumbnail.shape:
+            return True, thumbnail
+        diff = np.abs(thumbnail - self.reference)
+        mean_diff = float(diff.mean())
+        changed_fraction = float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+        roi_diff = 0.0
+        if len(self.rois):
+            if self.roi_cells is None:
+                self.roi_cells = self._roi_cells(frame.shape)
+            x0, y0, x1, y1 = self.roi_cells
+            integral = cv2.integral(diff.astype(np.uint8))
+            sums = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+            roi_diff = float((sums / ((x1 - x0) * (y1 - y0))).max())
+        self.metrics.update(mean_diff=mean_diff, changed_fraction=changed_fraction, roi_diff=roi_diff)
+
+        if mean_diff > self.mean_threshold or changed_fraction > self.changed_fraction or roi_diff > self.roi_threshold:
+            return True, thumbnail
+        if self.max_skips and self.consecutive_skips >= self.max_skips:
+            self.metrics["forced"] += 1
+            return True, thumbnail
+        self.consecutive_skips += 1
+        self.metrics["skips"] += 1
+        return False, thumbnail
+
+    def accept(self, thumbnail):
+        """Make a thumbnail the new reference after the model ran on its frame."""
+        self.reference = thumbnail
+        self.consecutive_skips = 0
+        self.metrics["inferences"] += 1
+
+    def skip_rate(self):
+        return self.metrics["skips"] / self.metrics["frames"] if self.metrics["frames"] else 0.0
+
+def check_stream(model, source, change_filter=None, max_frames=None):
+    """
+    Run Presence Checking over a video file or camera, reusing the last
+    prediction while the scene does not change.
+
+    Args:
+        model: The Presence Checking model object.
+        source (str or int): Video file path or camera index.
+        change_filter (ChangeFilter, optional): Pre-filter configuration.
+        max_frames (int, optional): Stop after this many frames.
+
+    Returns:
+        ChangeFilter: The filter, holding the metrics.
+    """
+    change_filter = change_filter or ChangeFilter()
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        logger.error(f"Unable to open video: {source}")
+        return change_filter
+    prediction = None
+    inference_time = filter_time = 0.0
+    try:
+        while max_frames is None or change_filter.metrics["frames"] < max_frames:
+            ok, bgr = capture.read()
+            if not ok:
+                break
+            frame = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            start_time = time.perf_counter()
+            run, thumbnail = change_filter.changed(frame)
+            filter_time += time.perf_counter() - start_time
+            if run or prediction is None:
+                start_time = time.perf_counter()
+                prediction = model.inference(dwsdk.Image.from_numpy(frame, dwsdk.Image.Type.RGB))
+                inference_time += time.perf_counter() - start_time
+                change_filter.accept(thumbnail)
+                logger.info(f"Frame {change_filter.metrics['frames']}: inferred, "
+                            f"{len(prediction.class_labels)} objects ({', '.join(prediction.class_labels)})")
+    finally:
+        capture.release()
+
+    metrics = change_filter.metrics
+    logger.info("=== Change Filter Metrics ===")
+    logger.info(f"  Frames {metrics['frames']}, inferences {metrics['inferences']}, "
+                f"reused {metrics['skips']} ({change_filter.skip_rate():.1%}), forced refreshes {metrics['forced']}")
+    if metrics["frames"]:
+        logger.info(f"  Filter cost {filter_time / metrics['frames'] * 1000:.2f} ms/frame, "
+                    f"inference {inference_time / max(metrics['inferences'], 1) * 1000:.2f} ms/inferred frame")
+    logger.info(f"  Thresholds: mean {change_filter.mean_threshold}, pixel {change_filter.pixel_threshold} "
+                f"x {change_filter.changed_fraction:.2%}, ROI {change_filter.roi_threshold}, max skips {change_filter.max_skips}")
+    return change_filter
+
 def create_output_directories(base_dir=r"python_demos\output"):
     """Create output directories if they do not exist."""
     if not os.path.exists(base_dir):
@@ -189,7 +343,13 @@ def generate_output_paths(base_dir=r"python_demos\output"):
     return image_output_path, json_output_path, annotation_output_path
 
 def main():
-    """Main function to demonstrate Presence Checking."""
+    """
+    Main function to demonstrate Presence Checking.
+
+    Usage: python presence_checking_demo.py [--stream SOURCE]
+    With --stream, frames of SOURCE (a video file or camera index) go through
+    the change-detection pre-filter and unchanged frames reuse the last prediction.
+    """
     logger.info("=== Starting Presence Checking Demo ===\n")
 
     # Paths (update these to your environment)
@@ -201,6 +361,13 @@ def main():
     
     # Step 2: Load model
     model = load_model(model_path)
+
+    if "--stream" in sys.argv[1:]:
+        args = sys.argv[sys.argv.index("--stream") + 1:]
+        source = args[0] if args else "0"
+        check_stream(model, int(source) if source.isdigit() else source)
+        logger.info("=== Presence Checking Demo Completed ===")
+        return
     
     # Step 3: Load image
     daoai_image = load_image(image_path)
@@ -3,25 +3,86 @@ import os
 import time
 import re
 import logging
-from PyQt5.QtWidgets import (QApplication, QLabel, QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QWidget, QScrollArea, QSplitter, QTextEdit)
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtCore import Qt, QPoint
+import threading
+import collections
+import concurrent.futures
+import json
+import cv2
+import numpy as np
+from PyQt5.QtWidgets import (QApplication, QLabel, QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog, QWidget, QScrollArea, QSplitter, QPlainTextEdit, QProgressBar, QCheckBox, QInputDialog, QTabWidget, QListView, QComboBox)
+from PyQt5.QtGui import QPixmap, QImage, QPainter, QColor
+from PyQt5.QtCore import Qt, QPoint, QSize, QTimer, QObject, QRunnable, QThreadPool, QAbstractListModel, QModelIndex, pyqtSignal
 import dwsdk.dwsdk as dwsdk
+from mask_utils import polygons_to_arrays, split_polygons
 
-# Custom handler to log to QTextEdit
-class QTextEditHandler(logging.Handler):
-    def __init__(self, text_edit_widget):
+# Custom handler to log to the log panel. Records from any thread are queued and
+# written to the widget in one chunk per timer tick, so a burst of thousands of
+# records costs one append/repaint instead of thousands.
+class BufferedLogHandler(logging.Handler):
+    def __init__(self, text_widget, flush_interval_ms=None, max_pending=None, max_lines=None):
         super().__init__()
-        self.text_edit_widget = text_edit_widget
+        self.text_widget = text_widget
+        # Oldest lines are discarded by the widget itself once max_lines is reached
+        self.text_widget.setMaximumBlockCount(max_lines or LOG_MAX_LINES)
+        # Bounded queue: in a burst, only the newest max_pending records are kept and formatted
+        self.pending = collections.deque(maxlen=max_pending or LOG_MAX_PENDING)
+        self.dropped = 0
+        self.pending_lock = threading.Lock()
+
+        # The timer lives on the UI thread, so flushing always touches the widget from there
+        self.flush_timer = QTimer(text_widget)
+        self.flush_timer.timeout.connect(self.flush_to_widget)
+        self.flush_timer.start(flush_interval_ms or LOG_FLUSH_MS)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_edit_widget.append(msg)
+        with self.pending_lock:
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+            self.pending.append(record)
+
+    def flush_to_widget(self):
+        with self.pending_lock:
+            if not self.pending:
+                return
+            records = list(self.pending)
+            self.pending.clear()
+            dropped, self.dropped = self.dropped, 0
+
+        lines = [self.format(record) for record in records]
+        if dropped:
+            lines.insert(0, f"... {dropped} log records dropped ...")
+        self.text_widget.appendPlainText("\n".join(lines))
 
 # Set up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Delay after the last wheel event before the zoomed image is re-rendered smoothly
+ZOOM_SETTLE_MS = 150
+
+# Log panel: flush interval, records kept per flush, and lines retained in the widget
+LOG_FLUSH_MS = 100
+LOG_MAX_PENDING = 2000
+LOG_MAX_LINES = 5000
+
+# Live mode: how often the UI polls for a new result frame
+LIVE_DISPLAY_INTERVAL_MS = 15
+
+# Folder browser: thumbnail edge length, decoded thumbnails kept in memory, decode threads
+THUMBNAIL_SIZE = 160
+THUMBNAIL_CACHE_SIZE = 1000
+THUMBNAIL_THREADS = 4
+BROWSER_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# dwsdk task classes the GUI can load; "Auto" tries them in this order
+SUPPORTED_TASKS = ["KeypointDetection", "InstanceSegmentation", "ObjectDetection", "RotatedObjectDetection",
+                   "SupervisedDefectSegmentation", "ClassificationModel", "MultilabelDetection",
+                   "PositioningModel", "PresenceChecking", "OCRModel"]
+# Tasks whose inference accepts the post-processing confidence threshold argument
+THRESHOLD_TASKS = ("KeypointDetection",)
+# Recently used models kept loaded so switching between recipes is instant
+MODEL_CACHE_SIZE = 3
+
 def initialize_sdk():
     try:
         logger.info("Initializing the SDK...")
@@ -31,44 +92,396 @@ def initialize_sdk():
         logger.error(f"Error during SDK initialization: {str(e)}")
         raise
 
-def load_model(model_path, device=dwsdk.DeviceType.CPU):
+def load_model(model_path, task="Auto", device=dwsdk.DeviceType.CPU):
+    """
+    Load a .dwm model as the given dwsdk task class.
+
+    With task "Auto", every supported task class available in the installed SDK
+    is tried in SUPPORTED_TASKS order; the SDK rejects a model file built for a
+    different task, so the first class that loads it is the model's task.
+
+    Returns:
+        (model, task): The loaded model and the name of its dwsdk class.
+    """
+    tasks = SUPPORTED_TASKS if task == "Auto" else [task]
+    logger.info(f"Loading model from: {model_path} (task: {task})")
+    errors = []
+    for task_name in tasks:
+        task_class = getattr(dwsdk, task_name, None)
+        if task_class is None:
+            continue  # Not available in this SDK version
+        try:
+            model = task_class(model_path, device=device)
+        except Exception as e:
+            errors.append(f"{task_name}: {str(e)}")
+            continue
+        logger.info(f"Model loaded successfully as {task_name}.\n")
+        return model, task_name
+    logger.error(f"Error during model loading: {'; '.join(errors) or 'no supported task class'}")
+    raise ValueError(f"Unable to load model {model_path} as {task}")
+
+def run_inference(model, daoai_image, confidence_threshold=0.95, task="KeypointDetection"):
     try:
-        logger.info(f"Loading model from: {model_path}")
-        model = dwsdk.KeypointDetection(model_path, device=device)
-        logger.info("Model loaded successfully.\n")
-        return model
-    except Exception as e:
-        logger.error(f"Error during model loading: {str(e)}")
-        raise
-
-def run_inference(model, daoai_image, confidence_threshold=0.95):
-    try:
-        logger.info(f"Running inference with confidence threshold: {confidence_threshold}")
-        prediction = model.inference(
-            daoai_image,
-            {dwsdk.PostProcessType.CONFIDENCE_THRESHOLD: confidence_threshold}
-        )
+        if task in THRESHOLD_TASKS:
+            logger.info(f"Running inference with confidence threshold: {confidence_threshold}")
+            prediction = model.inference(
+                daoai_image,
+                {dwsdk.PostProcessType.CONFIDENCE_THRESHOLD: confidence_threshold}
+            )
+        else:
+            logger.info("Running inference...")
+            prediction = model.inference(daoai_image)
         logger.info("Inference completed successfully.\n")
         return prediction
     except Exception as e:
         logger.error(f"Error during inference: {str(e)}")
         return None
 
-def visualize_and_save_result(daoai_image, prediction, output_path="python_demos/output/images"):
+def save_result_image(result, prediction_summary=None, output_path="python_demos/output/images"):
     try:
-        logger.info("Visualizing results and saving to output image...")
+        logger.info("Saving visualized result to output image...")
         os.makedirs(output_path, exist_ok=True)
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         timestamp = re.sub(r'[:]', '-', timestamp)  # Replace ':' to avoid invalid filename
         output_file = os.path.join(output_path, f"python_gui_example_result_{timestamp}.png")
-        result = dwsdk.visualize(daoai_image, prediction)
         result.save(output_file)
+        if prediction_summary is not None:
+            # Compact sidecar the folder browser overlays on demand
+            with open(prediction_sidecar_path(output_file), "w") as f:
+                json.dump(prediction_summary, f)
         logger.info(f"Visualization saved to: {output_file}\n")
         return output_file
     except Exception as e:
-        logger.error(f"Error during visualization: {str(e)}")
+        logger.error(f"Error during saving: {str(e)}")
+        return None
+
+def prediction_sidecar_path(image_path):
+    return os.path.splitext(image_path)[0] + ".json"
+
+def summarize_prediction(prediction):
+    """Boxes and keypoints of a prediction as plain lists (the sidecar format)."""
+    return {
+        "boxes": [[box.x1(), box.y1(), box.x2(), box.y2()]
+                  for box in getattr(prediction, "boxes", []) if hasattr(box, "x1")],
+        "keypoints": [[[kp.x, kp.y] for kp in keypoints] for keypoints in getattr(prediction, "keypoints", [])],
+    }
+
+def draw_prediction_overlay(pixmap, summary):
+    painter = QPainter(pixmap)
+    pen_width = max(2, pixmap.width() // 400)
+    painter.setPen(QColor(0, 255, 0))
+    for x1, y1, x2, y2 in summary.get("boxes", []):
+        painter.drawRect(int(x1), int(y1), int(x2 - x1), int(y2 - y1))
+    painter.setBrush(QColor(255, 0, 0))
+    for keypoints in summary.get("keypoints", []):
+        for x, y in keypoints:
+            painter.drawEllipse(QPoint(int(x), int(y)), 2 * pen_width, 2 * pen_width)
+    painter.end()
+
+# Channel count of a dwsdk.Image pixel buffer -> matching QImage format (SDK images are RGB ordered)
+QIMAGE_FORMATS = {1: QImage.Format_Grayscale8, 3: QImage.Format_RGB888, 4: QImage.Format_RGBA8888}
+
+def daoai_image_to_qimage(image):
+    """
+    Wrap the pixel buffer of a dwsdk.Image in a QImage without copying.
+
+    The QImage does not own the memory, so the returned numpy view is attached
+    to it and must stay alive as long as the QImage is used.
+    """
+    pixels = np.asarray(image, dtype=np.uint8)
+    if pixels.ndim != 3:
+        pixels = pixels.reshape(image.height, image.width, -1)
+    pixels = np.ascontiguousarray(pixels)  # No-op for the SDK's contiguous buffer
+    height, width, channels = pixels.shape
+    qimage = QImage(pixels.data, width, height, pixels.strides[0], QIMAGE_FORMATS[channels])
+    qimage.pixel_buffer = pixels
+    return qimage
+
+class InferenceSignals(QObject):
+    # request id, prediction, visualized dwsdk.Image, QImage over its pixels, inference seconds, total seconds
+    finished = pyqtSignal(int, object, object, object, float, float)
+    failed = pyqtSignal(int, str)
+
+class InferenceWorker(QRunnable):
+    """Runs one inference request on a QThreadPool thread and reports back through signals."""
+    def __init__(self, request_id, model, task, image_path, is_current):
+        super().__init__()
+        self.request_id = request_id
+        self.model = model
+        self.task = task
+        self.image_path = image_path
+        self.is_current = is_current  # Callable(request_id) -> False once the request is superseded
+        self.signals = InferenceSignals()
+
+    def run(self):
+        if not self.is_current(self.request_id):
+            return  # Superseded while still queued
+        start = time.perf_counter()
+        try:
+            daoai_image = dwsdk.Image(self.image_path)
+            inference_start = time.perf_counter()
+            prediction = run_inference(self.model, daoai_image, task=self.task)
+            inference_time = time.perf_counter() - inference_start
+        except Exception as e:
+            logger.error(f"Error during image loading: {str(e)}")
+            self.signals.failed.emit(self.request_id, "Image loading failed.")
+            return
+        if prediction is None:
+            self.signals.failed.emit(self.request_id, "Inference failed.")
+            return
+        if not self.is_current(self.request_id):
+            return  # Skip visualization for a result nobody will display
+
+        try:
+            result = dwsdk.visualize(daoai_image, prediction)
+            qimage = daoai_image_to_qimage(result)
+        except Exception as e:
+            logger.error(f"Error during visualization: {str(e)}")
+            self.signals.failed.emit(self.request_id, "Visualization failed.")
+            return
+        self.signals.finished.emit(self.request_id, prediction, result, qimage,
+                                   inference_time, time.perf_counter() - start)
+
+class LatestSlot:
+    """
+    Single-slot buffer between pipeline threads.
+
+    put() overwrites any item that has not been taken yet, so a slow consumer
+    only ever sees the newest frame and older ones are dropped (and counted)
+    instead of queuing up as latency.
+    """
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = None
+        self.dropped = 0
+
+    def put(self, item):
+        with self.condition:
+            if self.item is not None:
+                self.dropped += 1
+            self.item = item
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        # Returns None if nothing new arrived within timeout (timeout=0 never blocks)
+        with self.condition:
+            if self.item is None and timeout != 0:
+                self.condition.wait(timeout)
+            item, self.item = self.item, None
+            return item
+
+class RateMeter:
+    """Events per second over the last `window` events."""
+    def __init__(self, window=30):
+        self.timestamps = collections.deque(maxlen=window)
+
+    def tick(self):
+        self.timestamps.append(time.perf_counter())
+
+    def rate(self):
+        if len(self.timestamps) < 2:
+            return 0.0
+        span = self.timestamps[-1] - self.timestamps[0]
+        return (len(self.timestamps) - 1) / span if span > 0 else 0.0
+
+class LiveInferenceStream:
+    """
+    Capture -> inference pipeline on two threads for a video file or capture device.
+
+    Capture writes into frame_slot, inference takes the newest frame, visualizes it
+    and writes (capture time, QImage) into result_slot, which the UI polls.
+    """
+    def __init__(self, source, model, task, confidence_threshold=0.95):
+        self.source = source
+        self.model = model
+        self.task = task
+        self.confidence_threshold = confidence_threshold
+        self.frame_slot = LatestSlot()
+        self.result_slot = LatestSlot()
+        self.capture_meter = RateMeter()
+        self.inference_meter = RateMeter()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            raise IOError(f"Unable to open video source: {self.source}")
+        self.threads = [
+            threading.Thread(target=self.capture_loop, args=(capture,), daemon=True),
+            threading.Thread(target=self.inference_loop, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """Stop both threads; returns only once the inference thread is done with the model."""
+        self.stop_event.set()
+        capture_thread, inference_thread = self.threads
+        # Wait out the inference in progress, so the model is free when the caller re-enables inference
+        inference_thread.join()
+        # A stalled device can block capture.read(); that thread never touches the model
+        capture_thread.join(timeout=2.0)
+
+    def capture_loop(self, capture):
+        # Video files are paced at their own frame rate; devices deliver at their own pace
+        is_file = isinstance(self.source, str)
+        fps = capture.get(cv2.CAP_PROP_FPS) if is_file else 0
+        frame_interval = 1.0 / fps if fps and fps > 0 else 0.0
+        next_frame_at = time.perf_counter()
+        try:
+            while not self.stop_event.is_set():
+                ok, frame = capture.read()
+                if not ok:
+                    logger.info("Video source ended.")
+                    break
+                self.frame_slot.put((time.perf_counter(), frame))
+                self.capture_meter.tick()
+                if frame_interval:
+                    next_frame_at += frame_interval
+                    delay = next_frame_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            capture.release()
+
+    def inference_loop(self):
+        while not self.stop_event.is_set():
+            item = self.frame_slot.get(timeout=0.1)
+            if item is None:
+                continue
+            captured_at, frame = item
+            try:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                daoai_image = dwsdk.Image.from_numpy(rgb_frame, dwsdk.Image.Type.RGB)
+                if self.task in THRESHOLD_TASKS:
+                    prediction = self.model.inference(
+                        daoai_image,
+                        {dwsdk.PostProcessType.CONFIDENCE_THRESHOLD: self.confidence_threshold}
+                    )
+                else:
+                    prediction = self.model.inference(daoai_image)
+                qimage = daoai_image_to_qimage(dwsdk.visualize(daoai_image, prediction))
+            except Exception as e:
+                logger.error(f"Error during live inference: {str(e)}")
+                continue
+            self.inference_meter.tick()
+            self.result_slot.put((captured_at, qimage))
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)  # image path, thumbnail
+
+class ThumbnailLoader(QRunnable):
+    """Decodes one image at reduced resolution (libjpeg/libpng downscale while decoding)."""
+    def __init__(self, path, signals):
+        super().__init__()
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        thumbnail = cv2.imread(self.path, cv2.IMREAD_REDUCED_COLOR_8)
+        if thumbnail is None:
+            thumbnail = np.zeros((THUMBNAIL_SIZE, THUMBNAIL_SIZE, 3), dtype=np.uint8)
+        height, width = thumbnail.shape[:2]
+        scale = THUMBNAIL_SIZE / max(height, width)
+        if scale < 1:
+            thumbnail = cv2.resize(thumbnail, (max(1, int(width * scale)), max(1, int(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+        rgb = np.ascontiguousarray(cv2.cvtColor(thumbnail, cv2.COLOR_BGR2RGB))
+        height, width = rgb.shape[:2]
+        qimage = QImage(rgb.data, width, height, rgb.strides[0], QImage.Format_RGB888).copy()
+        self.signals.loaded.emit(self.path, qimage)
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    List model over the files of a folder with lazily decoded thumbnails.
+
+    QListView only asks for the rows it paints, so only visible thumbnails are
+    decoded. Decoded thumbnails live in a bounded LRU cache; decodes for rows
+    that were scrolled past are dropped before they start.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paths = []
+        self.rows = {}
+        self.cache = collections.OrderedDict()  # path -> QPixmap, least recently used first
+        self.pending = set()
+        self.placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        self.placeholder.fill(QColor(60, 60, 60))
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(THUMBNAIL_THREADS)
+        self.signals = ThumbnailSignals()
+        self.signals.loaded.connect(self.on_thumbnail_loaded)
+
+    def set_folder(self, folder):
+        self.cancel_pending()
+        self.beginResetModel()
+        with os.scandir(folder) as entries:
+            self.paths = sorted(entry.path for entry in entries
+                                if entry.is_file() and entry.name.lower().endswith(BROWSER_EXTENSIONS))
+        self.rows = {path: row for row, path in enumerate(self.paths)}
+        self.cache.clear()
+        self.endResetModel()
+        return len(self.paths)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.paths[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ToolTipRole:
+            return path
+        if role == Qt.DecorationRole:
+            pixmap = self.cache.get(path)
+            if pixmap is not None:
+                self.cache.move_to_end(path)
+                return pixmap
+            if path not in self.pending:
+                self.pending.add(path)
+                self.pool.start(ThumbnailLoader(path, self.signals))
+            return self.placeholder
         return None
 
+    def cancel_pending(self):
+        # Visible rows ask again on their next paint
+        self.pool.clear()
+        self.pending.clear()
+
+    def on_thumbnail_loaded(self, path, qimage):
+        self.pending.discard(path)
+        row = self.rows.get(path)
+        if row is None:
+            return  # Folder changed meanwhile
+        self.cache[path] = QPixmap.fromImage(qimage)
+        while len(self.cache) > THUMBNAIL_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+class ModelLoadSignals(QObject):
+    loaded = pyqtSignal(str, str, object)  # model path, task, model
+    failed = pyqtSignal(str, str)  # model path, error message
+
+class ModelLoadWorker(QRunnable):
+    """Loads a model on a background thread so the window stays usable."""
+    def __init__(self, model_path, task):
+        super().__init__()
+        self.model_path = model_path
+        self.task = task
+        self.signals = ModelLoadSignals()
+
+    def run(self):
+        try:
+            model, task = load_model(self.model_path, self.task)
+        except Exception as e:
+            self.signals.failed.emit(self.model_path, str(e))
+            return
+        self.signals.loaded.emit(self.model_path, task, model)
+
 class DraggableLabel(QLabel):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -86,17 +499,54 @@ class DraggableLabel(QLabel):
             self.move(self.pos() + move)
 
 class KeypointDetectionApp(QMainWindow):
-    def __init__(self, model_path):
+    def __init__(self, model_path=None, task="Auto"):
         super().__init__()
         self.setWindowTitle("Python GUI Example Demo")
         self.setGeometry(100, 100, 1400, 900)  # Window size
 
-        self.model = load_model(model_path)
+        # Models load in the background; recently used ones stay warm in an LRU cache
+        self.model = None
+        self.model_task = None
+        self.model_path = None
+        self.model_cache = collections.OrderedDict()  # (path, requested task) -> (model, task)
+        self.loading_models = set()
+        self.requested_model_key = None  # Only the latest request may become the active model
+        self.model_pool = QThreadPool(self)
+        self.model_pool.setMaxThreadCount(1)
         self.scale_factor = 1.0  # Initial zoom scale
         self.min_scale = 0.1    # Minimum zoom scale
         self.max_scale = 5.0    # Maximum zoom scale
-        self.inference_image_path = None  # Track the inference image
+        self.result_image = None  # Visualized dwsdk.Image of the last inference
+        self.source_pixmap = None  # Full-resolution pixmap currently displayed (input or result)
+
+        # While the wheel keeps moving, zoom with fast scaling; once it stops for
+        # ZOOM_SETTLE_MS, re-render the same scale with smooth scaling.
+        self.zoom_settle_timer = QTimer(self)
+        self.zoom_settle_timer.setSingleShot(True)
+        self.zoom_settle_timer.setInterval(ZOOM_SETTLE_MS)
+        self.zoom_settle_timer.timeout.connect(self.apply_zoom)
+
+        # One inference at a time; a newer request supersedes any queued or running one
+        self.inference_pool = QThreadPool(self)
+        self.inference_pool.setMaxThreadCount(1)
+        self.current_request_id = 0
+
+        # Saving results to disk is optional and never blocks the UI
+        self.save_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        # Live video/camera mode
+        self.live_stream = None
+        self.live_first_frame = False
+        self.live_latency_ms = 0.0
+        self.display_meter = RateMeter()
+        self.live_timer = QTimer(self)
+        self.live_timer.setInterval(LIVE_DISPLAY_INTERVAL_MS)
+        self.live_timer.timeout.connect(self.show_live_frame)
+
+        self.browsed_path = None  # Image selected in the folder browser
         self.initUI()
+        if model_path:
+            self.request_model(model_path, task)
 
     def initUI(self):
         # Use a QSplitter to split horizontally (left for image, right for log output)
@@ -110,10 +560,29 @@ class KeypointDetectionApp(QMainWindow):
         self.image_scroll.setWidgetResizable(True)
 
         # Right side: Output log
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
 
-        central_widget.addWidget(self.image_scroll)
+        # Folder browser: virtualized thumbnail grid
+        self.thumbnail_model = ThumbnailModel(self)
+        self.thumbnail_view = QListView()
+        self.thumbnail_view.setViewMode(QListView.IconMode)
+        self.thumbnail_view.setResizeMode(QListView.Adjust)
+        self.thumbnail_view.setMovement(QListView.Static)
+        self.thumbnail_view.setUniformItemSizes(True)
+        self.thumbnail_view.setLayoutMode(QListView.Batched)
+        self.thumbnail_view.setBatchSize(500)
+        self.thumbnail_view.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.thumbnail_view.setGridSize(QSize(THUMBNAIL_SIZE + 20, THUMBNAIL_SIZE + 30))
+        self.thumbnail_view.setModel(self.thumbnail_model)
+        self.thumbnail_view.clicked.connect(self.on_thumbnail_clicked)
+        self.thumbnail_view.verticalScrollBar().valueChanged.connect(self.thumbnail_model.cancel_pending)
+
+        self.view_tabs = QTabWidget()
+        self.view_tabs.addTab(self.image_scroll, "Image")
+        self.view_tabs.addTab(self.thumbnail_view, "Browser")
+
+        central_widget.addWidget(self.view_tabs)
         central_widget.addWidget(self.log_output)
 
         # Set horizontal stretch factors: image gets 2 parts, log gets 1 part
@@ -126,11 +595,56 @@ class KeypointDetectionApp(QMainWindow):
         self.load_button.clicked.connect(self.load_image)
         button_layout.addWidget(self.load_button)
 
+        self.model_button = QPushButton("Load Model")
+        self.model_button.clicked.connect(self.open_model)
+        button_layout.addWidget(self.model_button)
+
+        self.task_combo = QComboBox()
+        self.task_combo.addItems(["Auto"] + SUPPORTED_TASKS)
+        self.task_combo.setToolTip("Task of the model to load (Auto detects it)")
+        button_layout.addWidget(self.task_combo)
+
+        self.recent_models_combo = QComboBox()
+        self.recent_models_combo.setToolTip("Recently used models (kept loaded)")
+        self.recent_models_combo.setMinimumWidth(180)
+        self.recent_models_combo.activated.connect(self.on_recent_model_selected)
+        button_layout.addWidget(self.recent_models_combo)
+
+        self.folder_button = QPushButton("Open Folder")
+        self.folder_button.clicked.connect(self.open_folder)
+        button_layout.addWidget(self.folder_button)
+
+        self.overlay_checkbox = QCheckBox("Show Predictions")
+        self.overlay_checkbox.setToolTip("Overlay the stored prediction (<image>.json) when browsing")
+        self.overlay_checkbox.toggled.connect(self.refresh_browsed_image)
+        button_layout.addWidget(self.overlay_checkbox)
+
         self.infer_button = QPushButton("Run Inference")
         self.infer_button.clicked.connect(self.run_inference)
         self.infer_button.setEnabled(False)
         button_layout.addWidget(self.infer_button)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_inference)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
+
+        self.save_checkbox = QCheckBox("Save Results")
+        button_layout.addWidget(self.save_checkbox)
+
+        self.video_button = QPushButton("Open Video")
+        self.video_button.clicked.connect(self.open_video)
+        button_layout.addWidget(self.video_button)
+
+        self.camera_button = QPushButton("Open Camera")
+        self.camera_button.clicked.connect(self.open_camera)
+        button_layout.addWidget(self.camera_button)
+
+        self.stop_live_button = QPushButton("Stop Live")
+        self.stop_live_button.clicked.connect(self.stop_live)
+        self.stop_live_button.setEnabled(False)
+        button_layout.addWidget(self.stop_live_button)
+
         button_widget = QWidget()
         button_widget.setLayout(button_layout)
 
@@ -143,32 +657,71 @@ class KeypointDetectionApp(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        # Set custom logging handler to output to QTextEdit
-        text_edit_handler = QTextEditHandler(self.log_output)
-        text_edit_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logger.addHandler(text_edit_handler)
+        # Set custom logging handler to output to the log panel
+        log_handler = BufferedLogHandler(self.log_output)
+        log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(log_handler)
 
         # Adjust the vertical space allocation between image/log and buttons
         central_widget.setSizes([1000, 300])  # Image and log areas (combined) take up most of the height
         button_widget.setFixedHeight(60)  # Buttons are given a fixed height (this controls their space)
 
+        # Status bar: busy indicator while inference runs, timing once it finishes
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)  # Indeterminate
+        self.busy_indicator.setMaximumWidth(150)
+        self.busy_indicator.setVisible(False)
+        self.statusBar().addPermanentWidget(self.busy_indicator)
+
     def load_image(self):
         options = QFileDialog.Options()
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Image", "", "Images (*.png *.jpg *.jpeg)", options=options)
         if file_path:
-            self.image_path = file_path
-            pixmap = QPixmap(file_path)
-            self.image_label.setPixmap(pixmap)
-            self.image_label.setAlignment(Qt.AlignCenter)
-            self.scale_factor = 1.0  # Reset zoom scale
-            self.infer_button.setEnabled(True)
-            logger.info(f"Loaded image: {file_path}")
-            self.apply_auto_fit()
+            self.browsed_path = None
+            self.show_image_file(file_path)
+
+    def show_image_file(self, file_path, overlay=None):
+        self.stop_live()
+        self.supersede_inference()  # A result for the previous image is no longer wanted
+        self.image_path = file_path
+        self.result_image = None
+        self.source_pixmap = QPixmap(file_path)
+        if overlay is not None:
+            draw_prediction_overlay(self.source_pixmap, overlay)
+        self.image_label.setPixmap(self.source_pixmap)
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.scale_factor = 1.0  # Reset zoom scale
+        self.update_inference_button()
+        logger.info(f"Loaded image: {file_path}")
+        self.apply_auto_fit()
+
+    def open_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder")
+        if folder:
+            count = self.thumbnail_model.set_folder(folder)
+            self.view_tabs.setCurrentWidget(self.thumbnail_view)
+            logger.info(f"Browsing {count} images in: {folder}")
+
+    def on_thumbnail_clicked(self, index):
+        self.browsed_path = self.thumbnail_model.paths[index.row()]
+        self.refresh_browsed_image()
+        self.view_tabs.setCurrentWidget(self.image_scroll)
+
+    def refresh_browsed_image(self):
+        path = self.browsed_path
+        if path is None:
+            return
+        overlay = None
+        sidecar = prediction_sidecar_path(path)
+        if self.overlay_checkbox.isChecked() and os.path.exists(sidecar):
+            with open(sidecar) as f:
+                overlay = json.load(f)
+        self.show_image_file(path, overlay)
 
     def apply_auto_fit(self):
         # Get the size of the image label and the pixmap (image)
         label_size = self.image_label.size()
-        pixmap = QPixmap(self.image_path)
+        pixmap = self.source_pixmap
         image_size = pixmap.size()
 
         # Calculate scale factor based on label size and image size
@@ -195,17 +748,17 @@ class KeypointDetectionApp(QMainWindow):
         # Limit zoom range
         if self.min_scale <= new_scale <= self.max_scale:
             self.scale_factor = new_scale
-            self.apply_zoom()
+            self.apply_zoom(Qt.FastTransformation)
+            self.zoom_settle_timer.start()  # Restarts the idle countdown on every wheel step
         event.accept()
 
-    def apply_zoom(self):
-        # Load the image based on whether inference has been run or not
-        if hasattr(self, "inference_image_path") and self.inference_image_path:
-            pixmap = QPixmap(self.inference_image_path)
-        else:
-            pixmap = QPixmap(self.image_path)
+    def apply_zoom(self, transformation=Qt.SmoothTransformation):
+        # Scale the cached full-resolution pixmap (input image, or the result after inference)
+        if self.source_pixmap is None:
+            return
+        pixmap = self.source_pixmap
 
-        scaled_pixmap = pixmap.scaled(pixmap.size() * self.scale_factor, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        scaled_pixmap = pixmap.scaled(pixmap.size() * self.scale_factor, Qt.KeepAspectRatio, transformation)
         self.image_label.setPixmap(scaled_pixmap)
         self.image_label.adjustSize()
         
@@ -214,43 +767,227 @@ class KeypointDetectionApp(QMainWindow):
             logger.error("No image loaded.")
             return
 
-        daoai_image = dwsdk.Image(self.image_path)
-        prediction = run_inference(self.model, daoai_image)
-
-        if prediction:
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            timestamp = re.sub(r'[:]', '-', timestamp)  # Replace ':' to avoid invalid filename
-            output_path = os.path.join("python_demos/output/images")
-            os.makedirs(output_path, exist_ok=True)
-            result_path = visualize_and_save_result(daoai_image, prediction, output_path)
-
-            if result_path:
-                self.inference_image_path = result_path  # Store the inference image path
-                pixmap = QPixmap(result_path)
-                self.image_label.setPixmap(pixmap)
-                self.image_label.adjustSize()
-                logger.info(f"Result saved and displayed: {result_path}")
-
-            # Log detailed predictions (polygons and keypoints)
-            max_points_to_print = 5
-            logger.info("\nPolygons Output:")
-            for obj_index, mask in enumerate(prediction.masks):
-                polygons = mask.toPolygons()
-                logger.info(f"  Polygon Mask for Object {obj_index + 1}:")
-                for poly_index, polygon in enumerate(polygons):
-                    logger.info(f"    Polygon {poly_index + 1}:")
-                    for point_index, point in enumerate(polygon.points[:max_points_to_print]):
-                        logger.info(f"      Point {point_index + 1}: ({point.x}, {point.y})")
-                    if len(polygon.points) > max_points_to_print:
-                        logger.info(f"      ... and {len(polygon.points) - max_points_to_print} more points omitted.")
-
-            logger.info("\nKeypoints:")
-            for obj_index, keypoints in enumerate(prediction.keypoints):
-                logger.info(f"  Keypoints for Object {obj_index + 1}:")
-                for kp_index, keypoint in enumerate(keypoints):
-                    logger.info(f"    Keypoint {kp_index + 1}: (x: {keypoint.x}, y: {keypoint.y})")
-
-            self.apply_zoom()  # Apply zoom to the inference image
+        if self.model is None:
+            logger.error("No model loaded.")
+            return
+
+        self.supersede_inference()
+        worker = InferenceWorker(self.current_request_id, self.model, self.model_task, self.image_path,
+                                 self.is_current_request)
+        worker.signals.finished.connect(self.on_inference_finished)
+        worker.signals.failed.connect(self.on_inference_failed)
+        self.set_busy(True)
+        self.statusBar().showMessage("Running inference...")
+        self.inference_pool.start(worker)
+
+    def is_current_request(self, request_id):
+        return request_id == self.current_request_id
+
+    def supersede_inference(self):
+        # Invalidate outstanding requests and drop the ones that have not started yet.
+        # A running model.inference call cannot be interrupted; its result is discarded.
+        self.current_request_id += 1
+        self.inference_pool.clear()
+        self.set_busy(False)
+
+    def cancel_inference(self):
+        self.supersede_inference()
+        self.statusBar().showMessage("Inference cancelled.")
+        logger.info("Inference cancelled.")
+
+    def set_busy(self, busy):
+        self.busy_indicator.setVisible(busy)
+        self.cancel_button.setEnabled(busy)
+
+    def on_inference_failed(self, request_id, message):
+        if not self.is_current_request(request_id):
+            return
+        self.set_busy(False)
+        self.statusBar().showMessage(message)
+
+    def on_inference_finished(self, request_id, prediction, result, qimage, inference_time, total_time):
+        if not self.is_current_request(request_id):
+            return  # Superseded by a newer request
+        self.set_busy(False)
+        self.statusBar().showMessage(f"Inference: {inference_time * 1000:.1f} ms (total {total_time * 1000:.1f} ms)")
+
+        # Display straight from memory; the PNG is only written if saving is enabled
+        self.result_image = result
+        self.source_pixmap = QPixmap.fromImage(qimage)
+        self.image_label.setPixmap(self.source_pixmap)
+        self.image_label.adjustSize()
+        if self.save_checkbox.isChecked():
+            self.save_executor.submit(save_result_image, result, summarize_prediction(prediction))
+
+        # Log detailed predictions (polygons and keypoints)
+        max_points_to_print = 5
+        logger.info("\nPolygons Output:")
+        for obj_index, mask in enumerate(getattr(prediction, "masks", [])):
+            points, offsets = polygons_to_arrays(mask)
+            logger.info(f"  Polygon Mask for Object {obj_index + 1}:")
+            for poly_index, polygon in enumerate(split_polygons(points, offsets)):
+                logger.info(f"    Polygon {poly_index + 1}:")
+                for point_index, (x, y) in enumerate(polygon[:max_points_to_print]):
+                    logger.info(f"      Point {point_index + 1}: ({x}, {y})")
+                if len(polygon) > max_points_to_print:
+                    logger.info(f"      ... and {len(polygon) - max_points_to_print} more points omitted.")
+
+        logger.info("\nKeypoints:")
+        for obj_index, keypoints in enumerate(getattr(prediction, "keypoints", [])):
+            logger.info(f"  Keypoints for Object {obj_index + 1}:")
+            for kp_index, keypoint in enumerate(keypoints):
+                logger.info(f"    Keypoint {kp_index + 1}: (x: {keypoint.x}, y: {keypoint.y})")
+
+        self.apply_zoom()  # Apply zoom to the inference image
+
+    def open_video(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Video", "", "Videos (*.mp4 *.avi *.mkv *.mov)")
+        if file_path:
+            self.start_live(file_path)
+
+    def open_camera(self):
+        device_index, ok = QInputDialog.getInt(self, "Open Camera", "Capture device index:", 0, 0, 16)
+        if ok:
+            self.start_live(device_index)
+
+    def start_live(self, source):
+        if self.model is None:
+            logger.error("No model loaded.")
+            return
+        self.stop_live()
+        # The live thread uses the model; no still-image request may run. Queued requests are
+        # dropped, and a model.inference call that already started is waited for.
+        self.supersede_inference()
+        self.inference_pool.waitForDone()
+        stream = LiveInferenceStream(source, self.model, self.model_task)
+        try:
+            stream.start()
+        except IOError as e:
+            logger.error(str(e))
+            return
+        self.live_stream = stream
+        self.live_first_frame = True
+        self.infer_button.setEnabled(False)
+        self.stop_live_button.setEnabled(True)
+        self.live_timer.start()
+        logger.info(f"Live mode started: {source}")
+
+    def stop_live(self):
+        if self.live_stream is None:
+            return
+        self.live_timer.stop()
+        self.live_stream.stop()
+        logger.info(f"Live mode stopped. Frames dropped before inference: {self.live_stream.frame_slot.dropped}, "
+                    f"before display: {self.live_stream.result_slot.dropped}")
+        self.live_stream = None
+        self.stop_live_button.setEnabled(False)
+        self.update_inference_button()
+
+    def show_live_frame(self):
+        item = self.live_stream.result_slot.get(timeout=0)
+        if item is None:
+            return
+        captured_at, qimage = item
+        self.display_meter.tick()
+        self.live_latency_ms = (time.perf_counter() - captured_at) * 1000
+
+        self.source_pixmap = QPixmap.fromImage(qimage)
+        self.draw_live_overlay(self.source_pixmap)
+        if self.live_first_frame:
+            self.live_first_frame = False
+            self.apply_auto_fit()
+        else:
+            self.apply_zoom(Qt.FastTransformation)
+
+    def draw_live_overlay(self, pixmap):
+        stream = self.live_stream
+        text = (f"Capture {stream.capture_meter.rate():.1f} FPS | "
+                f"Inference {stream.inference_meter.rate():.1f} FPS | "
+                f"Display {self.display_meter.rate():.1f} FPS | "
+                f"Latency {self.live_latency_ms:.0f} ms")
+        painter = QPainter(pixmap)
+        font = painter.font()
+        font.setPixelSize(max(14, pixmap.height() // 40))
+        painter.setFont(font)
+        rect = painter.fontMetrics().boundingRect(text).adjusted(-6, -4, 6, 4)
+        rect.moveTopLeft(QPoint(8, 8))
+        painter.fillRect(rect, QColor(0, 0, 0, 160))
+        painter.setPen(QColor(0, 255, 0))
+        painter.drawText(rect, Qt.AlignCenter, text)
+        painter.end()
+
+    def update_inference_button(self):
+        self.infer_button.setEnabled(self.model is not None and hasattr(self, 'image_path')
+                                     and self.live_stream is None)
+
+    def open_model(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Model", "", "Models (*.dwm)")
+        if file_path:
+            self.request_model(file_path, self.task_combo.currentText())
+
+    def on_recent_model_selected(self, index):
+        key = self.recent_models_combo.itemData(index)
+        if key is not None:
+            self.request_model(*key)
+
+    def request_model(self, model_path, task="Auto"):
+        key = (model_path, task)
+        self.requested_model_key = key
+        if key in self.model_cache:
+            self.model_cache.move_to_end(key)
+            model, model_task = self.model_cache[key]
+            self.refresh_recent_models()
+            self.activate_model(model_path, model_task, model)
+            return
+        if key in self.loading_models:
+            return
+        self.loading_models.add(key)
+        self.statusBar().showMessage(f"Loading model {os.path.basename(model_path)}...")
+        worker = ModelLoadWorker(model_path, task)
+        worker.signals.loaded.connect(lambda path, model_task, model: self.on_model_loaded(key, model_task, model))
+        worker.signals.failed.connect(lambda path, message: self.on_model_failed(key, message))
+        self.model_pool.start(worker)
+
+    def on_model_loaded(self, key, model_task, model):
+        self.loading_models.discard(key)
+        self.model_cache[key] = (model, model_task)
+        self.model_cache.move_to_end(key)
+        while len(self.model_cache) > MODEL_CACHE_SIZE:
+            evicted_key, _ = self.model_cache.popitem(last=False)
+            logger.info(f"Unloaded model: {evicted_key[0]}")
+        self.refresh_recent_models()
+        if key != self.requested_model_key:
+            # The user picked another model while this one was loading; keep it cached only
+            logger.info(f"Model loaded into cache: {key[0]}")
+            return
+        self.activate_model(key[0], model_task, model)
+
+    def on_model_failed(self, key, message):
+        self.loading_models.discard(key)
+        self.statusBar().showMessage(f"Failed to load model: {message}")
+
+    def activate_model(self, model_path, model_task, model):
+        if model is self.model:
+            return
+        # Requests and live streams hold the previous model; stop them before switching
+        self.stop_live()
+        self.supersede_inference()
+        self.model = model
+        self.model_task = model_task
+        self.model_path = model_path
+        self.setWindowTitle(f"Python GUI Example Demo - {os.path.basename(model_path)} ({model_task})")
+        self.statusBar().showMessage(f"Model ready: {os.path.basename(model_path)} ({model_task})")
+        self.update_inference_button()
+
+    def refresh_recent_models(self):
+        self.recent_models_combo.clear()
+        for key in reversed(self.model_cache):
+            model_task = self.model_cache[key][1]
+            self.recent_models_combo.addItem(f"{os.path.basename(key[0])} ({model_task})", key)
+
+    def closeEvent(self, event):
+        self.stop_live()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -7,6 +7,8 @@ import logging
 os.add_dll_directory(r"C:\Program Files\DaoAI World SDK\SDK\Windows\x64\Release\3rdparty\\")
 os.add_dll_directory(r"C:\Program Files\DaoAI World SDK\SDK\Windows\x64\Release\lib\\")
 import dwsdk.dwsdk as dwsdk
+import numpy as np
+from rotated_box_utils import rotated_boxes_to_array, rotated_iou, rotated_nms
 
 # ——— Logging setup ———
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -79,6 +81,20 @@ def print_detection_results(prediction):
         )
     logger.info("=========================\n")
 
+def print_overlap_summary(prediction, iou_threshold=0.5):
+    """用 (N,5) 数组一次性计算旋转框两两 IoU，并给出旋转 NMS 后保留的框."""
+    try:
+        boxes = rotated_boxes_to_array(prediction)
+        scores = np.asarray(prediction.confidences, dtype=np.float64)
+        iou = rotated_iou(boxes)
+        pairs = np.argwhere(np.triu(iou, k=1) > iou_threshold)
+        for i, j in pairs:
+            logger.info(f"  Box {i + 1} / Box {j + 1}: rotated IoU {iou[i, j]:.2f}")
+        keep = rotated_nms(boxes, scores, iou_threshold, class_ids=prediction.class_ids)
+        logger.info(f"Rotated NMS (IoU > {iou_threshold}): kept {len(keep)} of {len(boxes)} boxes\n")
+    except Exception as e:
+        logger.error(f"Error during overlap summary: {e}")
+
 def create_output_dirs(base_dir="output"):
     """创建输出目录."""
     os.makedirs(base_dir, exist_ok=True)
@@ -135,6 +151,7 @@ def main():
         return
 
     print_detection_results(prediction)
+    print_overlap_summary(prediction)
 
     img_out, json_out = generate_output_paths("python_demos/output")
     visualize_and_save(daoai_img, prediction, img_out)
@@ -4,12 +4,30 @@ import cv2
 import time
 import json
 import logging
+import numpy as np
 import dwsdk.dwsdk as dwsdk
+from mask_utils import mask_to_array, polygons_to_arrays, rasterize_polygons
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger()
 
+# One row per connected defect region
+DEFECT_DTYPE = np.dtype([
+    ("image", np.int32), ("label", np.int32),
+    ("x", np.int32), ("y", np.int32), ("width", np.int32), ("height", np.int32),
+    ("area", np.int64), ("max_extent", np.int32), ("cx", np.float64), ("cy", np.float64),
+])
+
+# Example pass/fail rules per label (update to your labels):
+#   min_area   - smaller regions are treated as noise and ignored by the other rules
+#   max_count  - more regions than this fails the part
+#   max_area / max_extent - any single region above this fails the part
+DEFECT_RULES = {
+    "scratch": {"min_area": 20, "max_count": 2, "max_extent": 200},
+    "dent": {"min_area": 50, "max_count": 0},
+}
+
 def initialize_sdk():
     """
     Initialize the SDK.
@@ -166,6 +184,127 @@ def print_detection_results(prediction, max_points_to_print=3):
     
     logger.info("\nDetection results printed successfully.\n")
 
+class DefectStatsExtractor:
+    """
+    Connected-component statistics of every label mask of a prediction.
+
+    Each label mask is written once into a reusable uint8 buffer and labelled
+    with cv2.connectedComponentsWithStats, so no Python work is done per pixel
+    or per polygon point.
+
+    Args:
+        source (str): "raster" copies ``mask.toImage()`` into the buffer;
+              "polygons" fills ``mask.toPolygons()`` into it with cv2.fillPoly.
+        connectivity (int): 4 or 8.
+    """
+    def __init__(self, source="raster", connectivity=8):
+        self.source = source
+        self.connectivity = connectivity
+        self.buffer = None
+        self.labels = {}
+
+    def label_index(self, name):
+        if name not in self.labels:
+            self.labels[name] = len(self.labels)
+        return self.labels[name]
+
+    def _rasterize(self, mask):
+        if self.source == "raster":
+            image = mask.toImage()
+            shape = (image.height, image.width)
+            if self.buffer is None or self.buffer.shape != shape:
+                self.buffer = np.empty(shape, dtype=np.uint8)
+            return mask_to_array(image, out=self.buffer)
+        points, offsets = polygons_to_arrays(mask, source="polygons")
+        if self.buffer is None:
+            raise ValueError("The polygon source needs the frame size; call set_size() first")
+        self.buffer.fill(0)
+        return rasterize_polygons(points, offsets, self.buffer)
+
+    def set_size(self, height, width):
+        """Allocate the buffer up front (required for the polygon source)."""
+        self.buffer = np.zeros((height, width), dtype=np.uint8)
+
+    def extract(self, prediction, image_index=0):
+        """
+        Statistics of one prediction.
+
+        Returns:
+            np.ndarray: DEFECT_DTYPE table, one row per defect region.
+        """
+        tables = []
+        for name in prediction.masks.keys():
+            label = self.label_index(name)
+            pixels = self._rasterize(prediction.masks[name])
+            # Label only the bounding rectangle of the non-zero pixels; defects are usually sparse
+            x0, y0, width, height = cv2.boundingRect(pixels)
+            if width == 0:
+                continue
+            crop = pixels[y0:y0 + height, x0:x0 + width]
+            count, _, stats, centroids = cv2.connectedComponentsWithStats(crop, connectivity=self.connectivity)
+            table = np.empty(count - 1, dtype=DEFECT_DTYPE)
+            table["image"] = image_index
+            table["label"] = label
+            table["x"], table["y"] = stats[1:, cv2.CC_STAT_LEFT] + x0, stats[1:, cv2.CC_STAT_TOP] + y0
+            table["width"], table["height"] = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT]
+            table["area"] = stats[1:, cv2.CC_STAT_AREA]
+            table["max_extent"] = np.maximum(table["width"], table["height"])
+            table["cx"], table["cy"] = centroids[1:, 0] + x0, centroids[1:, 1] + y0
+            tables.append(table)
+        return np.concatenate(tables) if tables else np.empty(0, dtype=DEFECT_DTYPE)
+
+    def extract_batch(self, predictions):
+        """Statistics of several predictions in one table; ``image`` is the position in the batch."""
+        tables = [self.extract(prediction, i) for i, prediction in enumerate(predictions)]
+        return np.concatenate(tables) if tables else np.empty(0, dtype=DEFECT_DTYPE)
+
+def evaluate_defect_rules(table, num_images, label_indices, rules=DEFECT_RULES):
+    """
+    Apply per-label rules to a defect table of a whole batch at once.
+
+    Args:
+        table (np.ndarray): DEFECT_DTYPE rows from DefectStatsExtractor.
+        num_images (int): Batch size.
+        label_indices (dict): Label name -> index (DefectStatsExtractor.labels).
+        rules (dict): Label name -> rule dict (see DEFECT_RULES). Labels without
+              rules never fail a part.
+
+    Returns:
+        (np.ndarray, dict): bool (num_images,) pass array, and per label the
+                            (num_images,) counts of regions that passed min_area.
+    """
+    passed = np.ones(num_images, dtype=bool)
+    counts = {}
+    for name, rule in rules.items():
+        if name not in label_indices:
+            counts[name] = np.zeros(num_images, dtype=np.int64)
+            continue
+        rows = table[(table["label"] == label_indices[name]) & (table["area"] >= rule.get("min_area", 0))]
+        counts[name] = np.bincount(rows["image"], minlength=num_images)
+        if "max_count" in rule:
+            passed &= counts[name] <= rule["max_count"]
+        for field, key in (("area", "max_area"), ("max_extent", "max_extent")):
+            if key in rule:
+                too_large = rows["image"][rows[field] > rule[key]]
+                passed[too_large] = False
+    return passed, counts
+
+def print_defect_statistics(prediction, extractor=None, rules=DEFECT_RULES):
+    """Print per-label defect regions and the rule verdict for one prediction."""
+    try:
+        extractor = extractor or DefectStatsExtractor()
+        table = extractor.extract(prediction)
+        names = {index: name for name, index in extractor.labels.items()}
+        logger.info("Defect statistics:")
+        for row in table:
+            logger.info(f"  {names[row['label']]}: area {row['area']}, box ({row['x']}, {row['y']}, "
+                        f"{row['width']}x{row['height']}), max extent {row['max_extent']}")
+        passed, counts = evaluate_defect_rules(table, 1, extractor.labels, rules)
+        summary = ", ".join(f"{name} {count[0]}" for name, count in counts.items())
+        logger.info(f"Rule counts: {summary} -> {'PASS' if passed[0] else 'FAIL'}\n")
+    except Exception as e:
+        logger.error(f"Error during defect statistics: {str(e)}")
+
 def create_output_directories(base_dir=r"python_demos\output"):
     """Create output directories if they do not exist."""
     if not os.path.exists(base_dir):
@@ -223,6 +362,7 @@ def main():
 
     # Step 6: Print detection results
     print_detection_results(prediction)
+    print_defect_statistics(prediction)
     
     # Step 7: Visualize and save results
     visualize_and_save_result(daoai_image, prediction, output_path=image_output_path)
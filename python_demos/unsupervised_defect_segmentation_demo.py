@@ -3,6 +3,7 @@ import sys
 import cv2
 import numpy as np
 import shutil
+import time
 from pathlib import Path
 import dwsdk.dwsdk as dwsdk
 
@@ -32,6 +33,120 @@ class ImageAnnotation:
 
 annotations = []  # 所有图像标注数据列表
 
+# 阈值标定时的批大小，以及是否保存坏图的可视化结果（可视化不在打分的热路径上）
+CALIBRATION_BATCH_SIZE = 8
+VISUALIZE_RESULTS = False
+
+def score_images(model_instance, images, batch_size, keep_results=False):
+    """
+    使用 inferenceBatch 对图像按批推理，收集 ai_deviation_score。
+
+    最后不足 batch_size 的一批用最后一张图补齐，多出的结果直接丢弃。
+
+    Returns:
+        (np.ndarray, list): float64 得分数组；keep_results 为 True 时同时返回推理结果列表，否则为空列表。
+    """
+    scores = np.empty(len(images), dtype=np.float64)
+    results = []
+    elapsed = 0.0
+    for start in range(0, len(images), batch_size):
+        batch = images[start:start + batch_size]
+        real_count = len(batch)
+        batch = batch + [batch[-1]] * (batch_size - real_count)
+        t0 = time.perf_counter()
+        predictions = model_instance.inferenceBatch(batch)[:real_count]
+        elapsed += time.perf_counter() - t0
+        scores[start:start + real_count] = [p.ai_deviation_score for p in predictions]
+        if keep_results:
+            results.extend(predictions)
+    if len(images) > 0:
+        print(f"Scored {len(images)} images in {elapsed:.2f}s ({elapsed / len(images) * 1000:.2f} ms/image)")
+    return scores, results
+
+def calibrate_threshold(good_scores, bad_scores, image_threshold=None):
+    """
+    根据好图 / 坏图得分计算 ROC 与 Precision/Recall 曲线，并给出建议阈值。
+
+    坏图为正样本，得分 >= 阈值判为缺陷。所有曲线一次性向量化计算：
+    按得分降序排序后对标签做累加，每个不同得分对应曲线上的一个点。
+    建议阈值取 Youden J (TPR - FPR) 最大的点。
+
+    Returns:
+        dict: thresholds / fpr / tpr / precision / recall 数组，auc、建议阈值及其指标，
+              以及（如给出 image_threshold）模型自带阈值下的指标。
+    """
+    scores = np.concatenate([good_scores, bad_scores])
+    labels = np.concatenate([np.zeros(len(good_scores), dtype=bool), np.ones(len(bad_scores), dtype=bool)])
+    num_pos = labels.sum()
+    num_neg = labels.size - num_pos
+    if num_pos == 0 or num_neg == 0:
+        raise ValueError("Calibration needs at least one good and one bad image.")
+
+    order = np.argsort(-scores, kind="mergesort")
+    sorted_scores = scores[order]
+    sorted_labels = labels[order]
+
+    # 每个不同得分的最后一个位置即为该阈值下的累计计数
+    last_of_value = np.r_[np.flatnonzero(np.diff(sorted_scores)), sorted_scores.size - 1]
+    tps = np.cumsum(sorted_labels)[last_of_value]
+    fps = last_of_value + 1 - tps
+    thresholds = sorted_scores[last_of_value]
+
+    tpr = tps / num_pos
+    fpr = fps / num_neg
+    precision = tps / (tps + fps)
+    recall = tpr
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros_like(precision), where=(precision + recall) > 0)
+    roc_x = np.r_[0.0, fpr]
+    roc_y = np.r_[0.0, tpr]
+    auc = np.sum(np.diff(roc_x) * (roc_y[1:] + roc_y[:-1]) / 2)
+
+    best = int(np.argmax(tpr - fpr))
+    calibration = {
+        "thresholds": thresholds,
+        "fpr": fpr,
+        "tpr": tpr,
+        "precision": precision,
+        "recall": recall,
+        "auc": float(auc),
+        "suggested_threshold": float(thresholds[best]),
+        "suggested": {"tpr": float(tpr[best]), "fpr": float(fpr[best]),
+                      "precision": float(precision[best]), "f1": float(f1[best])},
+    }
+
+    if image_threshold is not None:
+        bad_hits = np.count_nonzero(bad_scores >= image_threshold)
+        good_hits = np.count_nonzero(good_scores >= image_threshold)
+        flagged = bad_hits + good_hits
+        calibration["model_threshold"] = {
+            "tpr": bad_hits / num_pos,
+            "fpr": good_hits / num_neg,
+            "precision": bad_hits / flagged if flagged else 0.0,
+        }
+    return calibration
+
+def print_calibration(calibration, image_threshold):
+    """打印阈值标定结果，并与模型自带的阈值进行对比。"""
+    suggested = calibration["suggested"]
+    print(f"ROC AUC: {calibration['auc']:.4f}")
+    print(f"Suggested threshold: {calibration['suggested_threshold']:.4f} "
+          f"(TPR={suggested['tpr']:.3f}, FPR={suggested['fpr']:.3f}, "
+          f"Precision={suggested['precision']:.3f}, F1={suggested['f1']:.3f})")
+    if "model_threshold" in calibration:
+        current = calibration["model_threshold"]
+        print(f"Model threshold:     {image_threshold:.4f} "
+              f"(TPR={current['tpr']:.3f}, FPR={current['fpr']:.3f}, Precision={current['precision']:.3f})")
+
+def save_visualizations(images, results, out_dir):
+    """对推理结果进行可视化并保存到 out_dir。"""
+    for idx, (img, result) in enumerate(zip(images, results)):
+        print(f"缺陷得分 [{idx}]:", result.ai_deviation_score)
+        vis = dwsdk.visualize(img, result)
+        output_path = os.path.join(out_dir, f"test_unsupervised_result_{idx}.png")
+        vis.save(output_path)
+        print(f"Saved visualization to: {os.path.abspath(output_path)}")
+
 def redrawImage():
     global originalImage, displayImage, scale, annotations, currentIndex
     # 根据缩放比例计算新尺寸
@@ -303,28 +418,25 @@ def main():
     component.save(compFile)
     # 训练后如果需要再次加载该组件，可使用:
     # component = model_instance.addComponentMemory("screw", "file_path")
-    model_instance.setBatchSize(1)
+    model_instance.setBatchSize(CALIBRATION_BATCH_SIZE)
     print("Component memory saved to", compFile)
 
-    print("Image Threshold of the model is: ",component.getImageThreshold())
-    # 8. (可选) 对所有坏图进行推理并保存结果
-    if bad_images:
-        for idx, img in enumerate(bad_images):
-            # 推理
-            result = model_instance.inference(img)
-            print(f"缺陷得分 [{idx}]:", result.ai_deviation_score)
-            print(f"JSON 结果 [{idx}]:", result.toAnnotationJSONString())
-
-            # 可视化
-            vis = dwsdk.visualize(img, result)
-
-            # 构造带索引的输出路径
-            output_filename = f"test_unsupervised_result_{idx}.png"
-            output_path = os.path.join(folderPath, "out", output_filename)
-
-            # 保存并打印绝对路径
-            vis.save(output_path)
-            print(f"Saved visualization to: {os.path.abspath(output_path)}")
-            
+    imageThreshold = component.getImageThreshold()
+    print("Image Threshold of the model is: ", imageThreshold)
+
+    # 8. 阈值标定：批量推理所有好图和坏图，收集缺陷得分并计算 ROC / PR 及建议阈值
+    if not good_images or not bad_images:
+        print("Skipping threshold calibration: need both good and bad images.")
+        return
+    good_scores, _ = score_images(model_instance, good_images, CALIBRATION_BATCH_SIZE)
+    bad_scores, bad_results = score_images(model_instance, bad_images, CALIBRATION_BATCH_SIZE,
+                                           keep_results=VISUALIZE_RESULTS)
+    calibration = calibrate_threshold(good_scores, bad_scores, imageThreshold)
+    print_calibration(calibration, imageThreshold)
+
+    # 9. (可选) 对坏图的推理结果进行可视化并保存，不影响上面的打分计时
+    if VISUALIZE_RESULTS and bad_results:
+        save_visualizations(bad_images, bad_results, os.path.join(folderPath, "out"))
+
 if __name__ == '__main__':
     main()